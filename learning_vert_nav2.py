@@ -5,6 +5,40 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
 from PyQt5.QtCore import Qt, QSize
 from PyQt5.QtGui import QFont # Optional: for consistent font
 
+_NAVBAR_QSS = """
+    QListWidget#navBar {
+        background-color: #f0f0f0; /* Light grey background for the navbar area */
+        border: 1px solid #cccccc; /* Optional: border for the whole navbar */
+        outline: 0; /* Remove focus outline around the QListWidget itself */
+    }
+
+    QListWidget#navBar::item {
+        background-color: #ffffff; /* White background for items */
+        color: #333333; /* Dark text color */
+        padding: 8px 5px;     /* Reduced padding: 8px top/bottom, 5px left/right */
+        margin: 1px 0px;      /* Small margin around items, primarily for visual separation if needed */
+        border: 1px solid #c5c5c5; /* Rectangle (border) around each item */
+        border-radius: 3px;   /* Optional: slightly rounded corners for the rectangle */
+    }
+
+    QListWidget#navBar::item:hover {
+        background-color: #e9e9e9; /* Light grey background on hover */
+        color: #000000;
+    }
+
+    QListWidget#navBar::item:selected {
+        background-color: #0078d4; /* Blue background for selected item */
+        color: white;               /* White text for selected item */
+        border: 1px solid #005a9e;  /* Darker blue border for selected item */
+    }
+
+    /* Basic styling for content area for contrast */
+    QStackedWidget#contentArea > QLabel {
+        background-color: #ffffff;
+        color: #333333;
+    }
+"""
+
 class SSHWidget(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -38,17 +72,19 @@ class SSHWidget(QMainWindow):
         self.stacked_widget = QStackedWidget()
         self.stacked_widget.setObjectName("contentArea")
 
+        label_font = QFont("Arial", 14) # Shared by all the content labels
+
         self.directory_widget = QLabel("TODO: Replace with DirectoryExplorer")
         self.directory_widget.setAlignment(Qt.AlignCenter)
-        self.directory_widget.setFont(QFont("Arial", 14))
+        self.directory_widget.setFont(label_font)
 
         self.processes_widget = QLabel("TODO: Replace with ProcessExplorer")
         self.processes_widget.setAlignment(Qt.AlignCenter)
-        self.processes_widget.setFont(QFont("Arial", 14))
+        self.processes_widget.setFont(label_font)
 
         self.favorites_widget = QLabel("Content for Favorites")
         self.favorites_widget.setAlignment(Qt.AlignCenter)
-        self.favorites_widget.setFont(QFont("Arial", 14))
+        self.favorites_widget.setFont(label_font)
 
         self.stacked_widget.addWidget(self.directory_widget)
         self.stacked_widget.addWidget(self.processes_widget)
@@ -68,40 +104,7 @@ class SSHWidget(QMainWindow):
             self.nav_bar.setCurrentRow(0)
 
     def apply_stylesheet(self):
-        style = """
-            QListWidget#navBar {{
-                background-color: #f0f0f0; /* Light grey background for the navbar area */
-                border: 1px solid #cccccc; /* Optional: border for the whole navbar */
-                outline: 0; /* Remove focus outline around the QListWidget itself */
-            }}
-
-            QListWidget#navBar::item {{
-                background-color: #ffffff; /* White background for items */
-                color: #333333; /* Dark text color */
-                padding: 8px 5px;     /* Reduced padding: 8px top/bottom, 5px left/right */
-                margin: 1px 0px;      /* Small margin around items, primarily for visual separation if needed */
-                border: 1px solid #c5c5c5; /* Rectangle (border) around each item */
-                border-radius: 3px;   /* Optional: slightly rounded corners for the rectangle */
-            }}
-
-            QListWidget#navBar::item:hover {{
-                background-color: #e9e9e9; /* Light grey background on hover */
-                color: #000000;
-            }}
-
-            QListWidget#navBar::item:selected {{
-                background-color: #0078d4; /* Blue background for selected item */
-                color: white;               /* White text for selected item */
-                border: 1px solid #005a9e;  /* Darker blue border for selected item */
-            }}
-
-            /* Basic styling for content area for contrast */
-            QStackedWidget#contentArea > QLabel {{
-                background-color: #ffffff;
-                color: #333333;
-            }}
-        """
-        self.setStyleSheet(style)
+        self.setStyleSheet(_NAVBAR_QSS)
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
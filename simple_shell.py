@@ -1,28 +1,61 @@
 #!/usr/bin/env python3
 import sys
 import threading
-import time
 import os
+import codecs
+import collections
+import re
+import select
 
-from PyQt5.QtWidgets import QApplication, QMainWindow, QTextEdit, QVBoxLayout, QWidget
-from PyQt5.QtCore import QThread, pyqtSignal, Qt
+from PyQt5.QtWidgets import QApplication, QMainWindow, QPlainTextEdit, QVBoxLayout, QWidget
+from PyQt5.QtCore import QObject, QTimer, QEvent, pyqtSignal, Qt
 from PyQt5.QtGui import QFont, QTextCursor
 
-import paramiko
+# Compiled once at import instead of on every chunk filter_ansi sees. CSI takes
+# the full ECMA-48 shape (parameter bytes, intermediate bytes, final byte), and
+# the OSC branch uses a negated class rather than a lazy .*?, so the engine walks
+# it in one pass instead of retrying at every character.
+_ANSI_ESCAPE = re.compile(r'\x1b(?:\[[\x30-\x3f]*[\x20-\x2f]*[\x40-\x7e]|\][0-9];[^\x07\n]*\x07|[()][AB012])', re.ASCII)
+_ANSI_SUB = _ANSI_ESCAPE.sub
 
-from dotenv import load_dotenv
+# Pre-encoded bytes for keys that are sent straight to the shell
+_ARROW_KEYS = {
+    Qt.Key_Up: b'\x1b[A',
+    Qt.Key_Down: b'\x1b[B',
+    Qt.Key_Right: b'\x1b[C',
+    Qt.Key_Left: b'\x1b[D',
+}
+_CTRL_C = b'\x03'
 
-load_dotenv()
+# Qt enums looked up once, rather than through sip on every event
+_KEY_PRESS = QEvent.KeyPress
+_ENTER_KEYS = (Qt.Key_Return, Qt.Key_Enter)
+_KEY_BACKSPACE = Qt.Key_Backspace
+_KEY_C = Qt.Key_C
+_CONTROL_MODIFIER = Qt.ControlModifier
 
 
-class SSHShell(QThread):
+class SSHShell(QObject):
+    # Emitted from the reader thread; Qt queues them across to the GUI thread
     output_received = pyqtSignal(str)
+    output_pending = pyqtSignal()  # Shell output is waiting in take_output()
+    
+    MAX_BATCH = 64 * 1024  # Most bytes drained per read burst
     
     def __init__(self):
         super().__init__()
         self.client = None
         self.shell = None
         self.connected = False
+        self._reader_thread = None
+        
+        # Filtered shell output waiting for the GUI to collect it
+        self._out_buf = collections.deque()
+        self._out_lock = threading.Lock()
+        
+        # Holds back a multi-byte character split across two reads until the
+        # rest of it arrives, instead of dropping its bytes
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
         
         # Hardcoded connection details
         self.hostname = os.getenv("HOST")
@@ -30,13 +63,16 @@ class SSHShell(QThread):
         self.password = None
         
     def connect_ssh(self):
+        # Imported here so the window can come up before paramiko (and the
+        # cryptography stack under it) has loaded
+        import paramiko
+        
         try:
             self.client = paramiko.SSHClient()
             self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
             self.client.connect(self.hostname, username=self.username, password=self.password)
             
             self.shell = self.client.invoke_shell()
-            self.shell.settimeout(0.1)
             self.connected = True
             
             self.output_received.emit(f"Connected to {self.hostname}\n")
@@ -46,8 +82,21 @@ class SSHShell(QThread):
             return False
     
     def send_command(self, command):
+        self.send_bytes((command + '\n').encode('utf-8'))
+    
+    def send_bytes(self, data):
         if self.shell and self.connected:
-            self.shell.send(command + '\n')
+            self.shell.send(data)
+    
+    def start(self):
+        # A plain daemon thread is all the blocking read loop needs; it has no
+        # use for a Qt event loop, and won't hold up interpreter exit
+        self._reader_thread = threading.Thread(target=self.run, daemon=True)
+        self._reader_thread.start()
+    
+    def join(self, timeout=None):
+        if self._reader_thread:
+            self._reader_thread.join(timeout)
     
     def run(self):
         if not self.connect_ssh():
@@ -55,22 +104,72 @@ class SSHShell(QThread):
             
         while self.connected:
             try:
+                # Sleep in select until the channel has data, instead of polling;
+                # the timeout just lets the loop notice disconnect()
+                readable, _, _ = select.select([self.shell], [], [], 1.0)
+                if not readable:
+                    continue
+                
+                # paramiko hands back everything it has buffered, up to the size
+                # asked for, so one recv usually takes the whole burst
+                data = self.shell.recv(self.MAX_BATCH)
+                if not data:
+                    break  # Channel closed by the server
+                
+                # Drain whatever else arrived meanwhile so a burst goes out as
+                # one batch, capped so the UI still gets regular updates.
+                # A single recv, the usual case, is decoded without a copy
                 if self.shell.recv_ready():
-                    output = self.shell.recv(1024).decode('utf-8', errors='ignore')
-                    # Filter out common ANSI escape sequences
-                    output = self.filter_ansi(output)
-                    self.output_received.emit(output)
-                time.sleep(0.1)
+                    chunks = [data]
+                    size = len(data)
+                    while size < self.MAX_BATCH and self.shell.recv_ready():
+                        chunk = self.shell.recv(self.MAX_BATCH - size)
+                        if not chunk:
+                            break
+                        chunks.append(chunk)
+                        size += len(chunk)
+                    data = b''.join(chunks)
+                
+                self._queue_output(self._decoder.decode(data))
             except Exception as e:
                 if "timed out" not in str(e).lower():
                     self.output_received.emit(f"Error: {str(e)}\n")
                     break
+        
+        # Flush any incomplete character left at the end of the stream
+        self._queue_output(self._decoder.decode(b'', final=True))
+    
+    def _queue_output(self, output):
+        if not output:
+            return
+        
+        # Filter out common ANSI escape sequences
+        output = self.filter_ansi(output)
+        if not output:
+            return
+        
+        # Only signal when the queue goes from empty to non-empty; the
+        # GUI takes everything queued so far when it gets round to it
+        with self._out_lock:
+            notify = not self._out_buf
+            self._out_buf.append(output)
+        if notify:
+            self.output_pending.emit()
+    
+    def take_output(self):
+        """Return and clear all shell output queued so far"""
+        with self._out_lock:
+            text = ''.join(self._out_buf)
+            self._out_buf.clear()
+        return text
     
     def filter_ansi(self, text):
-        import re
+        # Empty chunks and most others carry no escapes at all; hand them
+        # back as-is rather than running the regex and allocating a copy
+        if not text or '\x1b' not in text:
+            return text
         # Remove ANSI escape sequences more comprehensively
-        ansi_escape = re.compile(r'\x1b(?:\[[?0-9;]*[a-zA-Z]|\][0-9];.*?\x07|[()][AB012])')
-        return ansi_escape.sub('', text)
+        return _ANSI_SUB('', text)
 
     
     def disconnect(self):
@@ -86,9 +185,23 @@ class SSHTerminal(QMainWindow):
         self.init_ui()
         self.ssh_shell = SSHShell()
         self.ssh_shell.output_received.connect(self.append_output)
+        self.ssh_shell.output_pending.connect(self.schedule_flush)
+        
+        # Shell output is drawn at most once per frame (~16ms), however fast
+        # it arrives
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(16)
+        self.flush_timer.timeout.connect(self.flush_output)
+        
+        # Output that arrived while the window was hidden or minimized, kept
+        # out of the document until it's shown again
+        self.hidden_output = collections.deque(maxlen=5000)
+        
         self.ssh_shell.start()
         
-        self.command_buffer = ""
+        # Typed characters, joined only when Enter is pressed
+        self.command_buffer = []
         
     def init_ui(self):
         self.setWindowTitle("Simple SSH Shell")
@@ -99,11 +212,16 @@ class SSHTerminal(QMainWindow):
         self.setCentralWidget(central_widget)
         layout = QVBoxLayout(central_widget)
         
-        # Create terminal text area
-        self.terminal = QTextEdit()
+        # Create terminal text area. QPlainTextEdit keeps appends cheap, and the
+        # block limit turns it into a ring buffer of the most recent lines.
+        self.terminal = QPlainTextEdit()
+        self.terminal.setMaximumBlockCount(5000)
+        # Every insert would otherwise be kept on the undo stack, which grows
+        # without bound even though old blocks are dropped
+        self.terminal.setUndoRedoEnabled(False)
         self.terminal.setFont(QFont("Courier", 10))
         self.terminal.setStyleSheet("""
-            QTextEdit {
+            QPlainTextEdit {
                 background-color: black;
                 color: white;
                 border: none;
@@ -118,28 +236,47 @@ class SSHTerminal(QMainWindow):
         # Install event filter to capture key presses
         self.terminal.installEventFilter(self)
     
+    def schedule_flush(self):
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+    
+    def flush_output(self):
+        text = self.ssh_shell.take_output()
+        if not text:
+            return
+        
+        if self.isMinimized() or not self.isVisible():
+            self.hidden_output.append(text)
+        else:
+            self.append_output(text)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.hidden_output:
+            text = ''.join(self.hidden_output)
+            self.hidden_output.clear()
+            self.append_output(text)
+    
     def append_output(self, text):
-        cursor = self.terminal.textCursor()
-        cursor.movePosition(QTextCursor.End)
-        cursor.insertText(text)
-        self.terminal.setTextCursor(cursor)
+        self.terminal.moveCursor(QTextCursor.End)
+        self.terminal.insertPlainText(text)
         self.terminal.ensureCursorVisible()
     
     def eventFilter(self, obj, event):
-        if obj == self.terminal and event.type() == event.KeyPress:
+        if obj is self.terminal and event.type() == _KEY_PRESS:
             key = event.key()
             text = event.text()
             
             # Handle Enter key
-            if key == Qt.Key_Return or key == Qt.Key_Enter:
-                self.ssh_shell.send_command(self.command_buffer)
-                self.command_buffer = ""
+            if key in _ENTER_KEYS:
+                self.ssh_shell.send_command(''.join(self.command_buffer))
+                self.command_buffer.clear()
                 return True
             
             # Handle Backspace
-            elif key == Qt.Key_Backspace:
+            elif key == _KEY_BACKSPACE:
                 if self.command_buffer:
-                    self.command_buffer = self.command_buffer[:-1]
+                    self.command_buffer.pop()
                     # Remove last character from display
                     cursor = self.terminal.textCursor()
                     cursor.deletePreviousChar()
@@ -147,28 +284,21 @@ class SSHTerminal(QMainWindow):
             
             # Handle regular characters
             elif len(text) == 1 and text.isprintable():
-                self.command_buffer += text
+                self.command_buffer.append(text)
                 cursor = self.terminal.textCursor()
                 cursor.insertText(text)
                 return True
             
             # Handle special keys (arrows, etc.)
-            elif key in [Qt.Key_Up, Qt.Key_Down, Qt.Key_Left, Qt.Key_Right]:
+            elif key in _ARROW_KEYS:
                 # For vi and other applications, send these directly
-                if key == Qt.Key_Up:
-                    self.ssh_shell.send_command('\033[A')
-                elif key == Qt.Key_Down:
-                    self.ssh_shell.send_command('\033[B')
-                elif key == Qt.Key_Left:
-                    self.ssh_shell.send_command('\033[D')
-                elif key == Qt.Key_Right:
-                    self.ssh_shell.send_command('\033[C')
+                self.ssh_shell.send_bytes(_ARROW_KEYS[key])
                 return True
             
             # Handle Ctrl+C
-            elif key == Qt.Key_C and event.modifiers() == Qt.ControlModifier:
-                self.ssh_shell.send_command('\003')  # Send Ctrl+C
-                self.command_buffer = ""
+            elif key == _KEY_C and event.modifiers() == _CONTROL_MODIFIER:
+                self.ssh_shell.send_bytes(_CTRL_C)  # Send Ctrl+C
+                self.command_buffer.clear()
                 return True
             
             return True
@@ -176,11 +306,17 @@ class SSHTerminal(QMainWindow):
         return super().eventFilter(obj, event)
     
     def closeEvent(self, event):
+        # Closing the channel wakes the reader out of select
         self.ssh_shell.disconnect()
-        self.ssh_shell.wait()
+        self.ssh_shell.join(1.0)
         event.accept()
 
 def main():
+    # Only read .env when the connection details aren't already in the environment
+    if not os.getenv("HOST"):
+        from dotenv import load_dotenv
+        load_dotenv()
+    
     app = QApplication(sys.argv)
     terminal = SSHTerminal()
     terminal.show()
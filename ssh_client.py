@@ -0,0 +1,1040 @@
+import json
+import os
+import errno
+import posixpath
+import re
+import secrets
+import select
+import shlex
+import socket
+import stat
+import threading
+import time
+import appdirs
+import collections
+
+from PyQt5.QtCore import QObject, QSocketNotifier, pyqtSignal
+
+
+# Compiled once and shared by every interactive shell. Operates on raw bytes so
+# chunks without an ESC byte can skip the regex (and the extra decode) entirely.
+# Every branch is linear with no backtracking: CSI (ESC [ params intermediates
+# final), OSC up to BEL or ST, charset designators, and the short ESC = > 7 8 D E H M c.
+_ANSI_ESCAPE = re.compile(rb'\x1b(?:\[[0-?]*[ -/]*[@-~]|\][^\x07\x1b]*(?:\x07|\x1b\\)|[()][ -~]|[=>78DEHMc])')
+_ANSI_SUB = _ANSI_ESCAPE.sub
+
+# Matches one `ls -la` entry: permissions, size and the (possibly spaced) name
+_LS_LINE = re.compile(r'^(\S+)\s+\S+\s+\S+\s+\S+\s+(\S+)\s+\S+\s+\S+\s+\S+\s(.+)$')
+
+# Directory entry type by st_mode format bits; anything else is a file
+_IFMT_TYPES = {stat.S_IFDIR: 'directory', stat.S_IFLNK: 'link'}
+
+# Bytes stripped from either end of command output
+_WHITESPACE = b' \t\n\r\x0b\x0c'
+
+# Column names for the `ps` output parsed by iter_processes, in order
+_PS_KEYS = ('user', 'pid', 'cpu', 'mem', 'vsz', 'rss', 'tty', 'stat', 'start', 'time', 'command')
+
+# One row of iter_processes; cpu and mem are floats, the rest strings
+Process = collections.namedtuple('Process', _PS_KEYS)
+
+# One command in SSHClient.history, with its (possibly trimmed) output.
+# return_code is None for commands typed into the interactive shell.
+HistoryEntry = collections.namedtuple('HistoryEntry', ('command', 'output', 'return_code'))
+
+
+def _filter_ansi(data):
+    """Filter ANSI escape sequences from raw shell bytes"""
+    # Everything before the first ESC is plain text, so the regex only has to
+    # walk the rest. 8-bit CSI (0x9b) isn't looked for here: in raw bytes it is
+    # also an ordinary UTF-8 continuation byte.
+    start = data.find(b'\x1b')
+    if start < 0:
+        return data
+    return data[:start] + _ANSI_SUB(b'', data[start:])
+
+
+def _decode_output(data):
+    """Decode a command's output bytes, minus surrounding whitespace"""
+    # Trim by index and decode through a memoryview, so the decoded str is
+    # the only copy made, rather than a decoded copy and then a stripped one
+    start, end = 0, len(data)
+    while end > start and data[end - 1] in _WHITESPACE:
+        end -= 1
+    while start < end and data[start] in _WHITESPACE:
+        start += 1
+    return str(memoryview(data)[start:end], 'utf-8', 'replace')
+
+
+class SSHClient(QObject):
+    """Handles SSH connection and remote operations"""
+    
+    # Signals for shell events
+    shell_output = pyqtSignal(str)  # Filtered shell output
+    shell_error = pyqtSignal(str)   # Shell errors
+    shell_started = pyqtSignal()    # Shell session started
+    shell_stopped = pyqtSignal()    # Shell session stopped
+    
+    DATA_DIR = appdirs.user_data_dir("shhwomper", "shhwomper")
+    os.makedirs(DATA_DIR, exist_ok=True)
+    SAVE_PATH = os.path.join(DATA_DIR, "saved_clients.json")
+
+    # Printed after each command run through the command shell, so we know
+    # where its output ends and what it returned. Each shell adds a random
+    # nonce, so output that happens to contain the marker can't end a command.
+    COMMAND_SENTINEL = '__SSHWOMPER_DONE__'
+    # Seconds of silence from the command shell before one of the app's own
+    # commands (listings, ps, cd) is given up on; typed commands never time out
+    COMMAND_TIMEOUT = 30
+    # Times a failed command shell is replaced before falling back for good
+    COMMAND_SHELL_REOPENS = 3
+
+    # How long a directory listing is reused, and how many are kept
+    DIR_CACHE_TTL = 5.0
+    DIR_CACHE_SIZE = 128
+
+    # Characters of recent shell output kept for get_shell_buffer()
+    SHELL_BUFFER_LIMIT = 1 << 20
+    # Most shell output read per wakeup; anything more is picked up on the
+    # next pass through the event loop, so a flood can't starve the UI
+    SHELL_READ_LIMIT = 256 * 1024
+
+    # Characters of output kept with each command in history
+    HISTORY_OUTPUT_LIMIT = 16 * 1024
+
+    # In-memory copy of SAVE_PATH, reloaded when the file's mtime changes.
+    # _clients_index maps (hostname, username, port) to the saved entry.
+    # Connect workers save from their own threads, hence the lock.
+    _saved_clients = []
+    _clients_index = {}
+    _saved_clients_mtime = None
+    _saved_clients_lock = threading.RLock()
+
+    # Live paramiko connections shared between SSHClients for the same
+    # (hostname, username, port, password), as [paramiko.SSHClient, user count].
+    # The password is part of the key so a login only ever reuses a connection
+    # that was authenticated with the very same credentials.
+    # Each SSHClient still opens its own channels over the shared transport.
+    _pool = {}
+    _pool_lock = threading.Lock()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.ssh_client = None
+        self.transport = None
+        self.sftp_client = None
+        self.current_path = None
+        self.history = collections.deque(maxlen=200)  # HistoryEntry per command
+        self.connection_info = {}
+        self.command_shell = None
+        self.command_marker = None
+        # Held while a command runs in command_shell; its output is one stream
+        self.command_lock = threading.Lock()
+        self.command_shell_reopens = self.COMMAND_SHELL_REOPENS
+        # Held while sftp_client is in use; paramiko's SFTPClient is not
+        # safe to share between the listing and cd worker threads
+        self.sftp_lock = threading.Lock()
+        self.home_path = None
+        # path -> (entries, time fetched), least recently used first
+        self.dir_cache = collections.OrderedDict()
+        self.dir_cache_generation = 0  # Bumped whenever the cache is invalidated
+        
+        # Interactive shell support
+        self.shell = None
+        self.shell_notifier = None
+        self.shell_running = False
+        # Recent output chunks, trimmed from the head once they add up to more
+        # than SHELL_BUFFER_LIMIT characters so long sessions stay bounded
+        self.shell_buffer = collections.deque()
+        self._shell_buffer_size = 0
+        
+        # Output callbacks (kept for backward compatibility)
+        self.output_callbacks = []
+
+    def connect(self, hostname, username, password=None, port=22):
+        """Establish SSH connection"""
+        try:
+            self.connection_info = {
+                'hostname': hostname,
+                'username': username,
+                'port': port
+            }
+
+            if password:
+                self.connection_info['password'] = password
+
+            # Reuse a live connection to the same account, opened with the same
+            # credentials, when there is one, skipping the TCP handshake, key
+            # exchange and authentication
+            key = self._client_key(self.connection_info) + (password,)
+            self.ssh_client = self._acquire_pooled(key)
+
+            pooled = self.ssh_client is not None
+            if not pooled:
+                self.ssh_client = self._open_client(hostname, username, password, port)
+                self._add_pooled(key, self.ssh_client)
+
+            if not self._open_channels() and pooled:
+                # The shared connection is at the server's session limit
+                # (MaxSessions); give this client a connection of its own,
+                # kept out of the pool
+                self.disconnect()
+                self.ssh_client = self._open_client(hostname, username, password, port)
+                self._open_channels()
+
+            # Resolve $HOME and the starting directory now, while we're off the
+            # UI thread, in one command so Home is instant
+            self._probe_session()
+
+            # Send a keepalive message every 30 seconds so our session doesn't timeout
+            self.transport.set_keepalive(30)
+
+            # Save this client if it's new
+            self._save_client(self.connection_info)
+
+            return True
+
+        except Exception as e:
+            self.disconnect()
+            raise e
+
+    def _open_client(self, hostname, username, password, port):
+        """Open and authenticate a new connection"""
+        # Imported here rather than at module load: paramiko pulls in
+        # cryptography, which is slow to import and not needed to show the UI
+        import paramiko
+        
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+
+        # Connect. Compression has to be asked for here, as it's negotiated
+        # during the handshake; listings and ps output are text and shrink well.
+        if password:
+            client.connect(
+                hostname=hostname,
+                port=port,
+                username=username,
+                password=password,
+                timeout=10,
+                compress=True
+            )
+        else:
+            client.connect(
+                hostname=hostname,
+                port=port,
+                username=username,
+                timeout=10,
+                compress=True
+            )
+        # Interactive shells send one tiny packet per keystroke; turn
+        # off Nagle so those aren't held back waiting on an ACK
+        try:
+            client.get_transport().sock.setsockopt(
+                socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except:
+            pass
+        return client
+
+    def _open_channels(self):
+        """
+        Open the SFTP session and command shell on ssh_client. Returns False
+        if either couldn't be opened, as when the server is at MaxSessions.
+        """
+        import paramiko
+        
+        # Channels opened from here on (exec, sftp, shell) get a larger window,
+        # so bulk output isn't stalled waiting on window adjustments.
+        transport = self.transport = self.ssh_client.get_transport()
+        transport.default_window_size = 8 << 20
+
+        try:
+            self.sftp_client = self.ssh_client.open_sftp()
+        except paramiko.ChannelException:
+            return False
+
+        self.command_shell_reopens = self.COMMAND_SHELL_REOPENS
+        return self._open_command_shell()
+
+    def start_interactive_shell(self):
+        """Start an interactive shell session"""
+        if not self.ssh_client:
+            raise Exception("Not connected to SSH server")
+        
+        if self.shell_running:
+            return  # Already running
+        
+        try:
+            # What SSHClient.invoke_shell does, on the transport cached at connect
+            shell = self.transport.open_session()
+            shell.get_pty()
+            shell.invoke_shell()
+            self.shell = shell
+            self.shell_running = True
+            
+            # paramiko makes the fd behind fileno() readable whenever the
+            # channel has data (or has closed), so the event loop can watch
+            # it directly rather than a reader thread waiting on it
+            self.shell_notifier = QSocketNotifier(self.shell.fileno(), QSocketNotifier.Read, self)
+            self.shell_notifier.activated.connect(self._read_shell)
+            
+            # Emit signal that shell started
+            self.shell_started.emit()
+            
+            return True
+            
+        except Exception as e:
+            self.shell_running = False
+            raise e
+
+    def stop_interactive_shell(self):
+        """Stop the interactive shell session"""
+        self.shell_running = False
+        
+        # Stop watching the channel before it goes away
+        if self.shell_notifier:
+            self.shell_notifier.setEnabled(False)
+            self.shell_notifier.deleteLater()
+            self.shell_notifier = None
+        
+        # Clean up shell
+        if self.shell:
+            try:
+                self.shell.close()
+            except:
+                pass
+            self.shell = None
+        
+        # Emit signal that shell stopped
+        self.shell_stopped.emit()
+
+    def send_to_shell(self, command):
+        """Send a command to the interactive shell"""
+        if not self.shell or not self.shell_running:
+            raise Exception("Interactive shell not running")
+        
+        try:
+            self.shell.send(command + '\n')
+            self.history.append(HistoryEntry(command, '', None))
+        except Exception as e:
+            raise Exception(f"Failed to send command: {e}")
+
+    def add_output_callback(self, callback):
+        """Add a callback function to receive shell output (backward compatibility)"""
+        self.output_callbacks.append(callback)
+
+    def remove_output_callback(self, callback):
+        """Remove an output callback (backward compatibility)"""
+        if callback in self.output_callbacks:
+            self.output_callbacks.remove(callback)
+
+    def _read_shell(self):
+        """Read whatever the shell has buffered and pass it on, filtered"""
+        shell = self.shell
+        if shell is None:
+            return
+        
+        data = bytearray()
+        error = None
+        try:
+            while len(data) < self.SHELL_READ_LIMIT and shell.recv_ready():
+                chunk = shell.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+        except Exception as e:
+            error = e
+        
+        if data:
+            output = _filter_ansi(data).decode('utf-8', errors='ignore')
+            if output:
+                self._on_shell_output(output)
+        
+        if error is not None:
+            self._on_shell_error(f"Shell reader error: {error}")
+        
+        # A closed channel leaves the fd readable for good, so end the
+        # session once everything it sent has been read
+        if error is not None or shell.closed or (shell.eof_received and not shell.recv_ready()):
+            self._on_shell_closed()
+
+    def _on_shell_output(self, output):
+        """Handle filtered shell output"""
+        # Interactive output is kept in the shell buffer only. Splitting it into
+        # history lines cost a pass over every chunk, and a single `cat` would
+        # push the commands themselves out of the bounded history.
+        self.shell_buffer.append(output)
+        self._shell_buffer_size += len(output)
+        while self._shell_buffer_size > self.SHELL_BUFFER_LIMIT and len(self.shell_buffer) > 1:
+            self._shell_buffer_size -= len(self.shell_buffer.popleft())
+        
+        # Call legacy output callbacks for backward compatibility.
+        # Iterate a snapshot so callbacks can remove themselves safely.
+        if self.output_callbacks:
+            for callback in tuple(self.output_callbacks):
+                try:
+                    callback(output)
+                except Exception as e:
+                    self.shell_error.emit(f"Output callback error: {e}")
+        
+        # Emit signal for Qt-based handlers, if anything is listening
+        if self.receivers(self.shell_output) > 0:
+            self.shell_output.emit(output)
+
+    def _on_shell_error(self, error):
+        """Handle shell read errors"""
+        self.shell_error.emit(error)
+
+    def _on_shell_closed(self):
+        """Handle the shell ending from the remote side"""
+        if self.shell_running:
+            self.stop_interactive_shell()
+
+    def get_shell_buffer(self):
+        """Get the current shell output buffer"""
+        return ''.join(self.shell_buffer)
+
+    def clear_shell_buffer(self):
+        """Clear the shell output buffer"""
+        self.shell_buffer.clear()
+        self._shell_buffer_size = 0
+
+    def is_shell_running(self):
+        """Check if interactive shell is running"""
+        return self.shell_running and self.shell is not None
+
+    @staticmethod
+    def _client_key(info):
+        """Identity of a saved client; the password isn't part of it"""
+        return (info['hostname'], info['username'], info['port'])
+
+    @classmethod
+    def _save_client(cls, info):
+        """Save client info to disk if it's not already saved"""
+        key = cls._client_key(info)
+        with cls._saved_clients_lock:
+            # Pick up any changes made on disk; when the file is unchanged
+            # this is just a stat, and the index answers the common reconnect
+            cls.get_saved_clients()
+            if key not in cls._clients_index:
+                cls._saved_clients.append(info)
+                cls._clients_index[key] = info
+                try:
+                    cls._flush_saved_clients()
+                except Exception as e:
+                    print(f"Failed to save client: {e}")
+
+    @classmethod
+    def _flush_saved_clients(cls):
+        """Atomically write the in-memory client list to SAVE_PATH"""
+        # Write a temp file and swap it in, so a crash mid-write can never
+        # leave a truncated saved_clients.json behind
+        tmp_path = cls.SAVE_PATH + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(cls._saved_clients, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, cls.SAVE_PATH)
+        cls._saved_clients_mtime = os.stat(cls.SAVE_PATH).st_mtime_ns
+
+    @classmethod
+    def get_saved_clients(cls):
+        """Retrieve all saved SSH clients"""
+        with cls._saved_clients_lock:
+            try:
+                mtime = os.stat(cls.SAVE_PATH).st_mtime_ns
+            except OSError:
+                cls._saved_clients, cls._clients_index = [], {}
+                cls._saved_clients_mtime = None
+                return []
+
+            # Only re-parse the file when it has changed on disk
+            if mtime != cls._saved_clients_mtime:
+                try:
+                    with open(cls.SAVE_PATH, 'r') as f:
+                        cls._saved_clients = json.load(f)
+                    cls._clients_index = {cls._client_key(c): c for c in cls._saved_clients}
+                    cls._saved_clients_mtime = mtime
+                except Exception as e:
+                    print(f"Failed to load clients: {e}")
+                    return []
+            return list(cls._saved_clients)
+    
+    @classmethod
+    def _acquire_pooled(cls, key):
+        """Take a share of the live pooled connection for key, if there is one"""
+        with cls._pool_lock:
+            entry = cls._pool.get(key)
+            if entry is None:
+                return None
+            transport = entry[0].get_transport()
+            if transport is None or not transport.is_active():
+                # Dead; its remaining users close it when they disconnect
+                del cls._pool[key]
+                return None
+            entry[1] += 1
+            return entry[0]
+
+    @classmethod
+    def _add_pooled(cls, key, client):
+        """Offer a freshly opened connection for others to share"""
+        with cls._pool_lock:
+            if key not in cls._pool:
+                cls._pool[key] = [client, 1]
+
+    @classmethod
+    def _release_pooled(cls, client):
+        """Drop one user of a connection, closing it once nobody is left"""
+        with cls._pool_lock:
+            for key, entry in cls._pool.items():
+                if entry[0] is client:
+                    entry[1] -= 1
+                    if entry[1] > 0:
+                        return
+                    del cls._pool[key]
+                    break
+        client.close()
+
+    @classmethod
+    def close_pool(cls):
+        """Close every pooled connection, whoever is still using it"""
+        with cls._pool_lock:
+            entries = list(cls._pool.values())
+            cls._pool.clear()
+        for client, _ in entries:
+            try:
+                client.close()
+            except:
+                pass
+
+    @classmethod
+    def start_saved_client(cls, connection_info, parent=None):
+        """Creates a SSHClient for all saved clients"""
+        cl = cls(parent)
+        cl.connect(
+            connection_info["hostname"], 
+            connection_info["username"],
+            connection_info.get("password", None),
+            connection_info["port"],
+        )
+        return cl
+
+    def disconnect(self):
+        """Close SSH and SFTP connections"""
+        # Stop interactive shell first
+        self.stop_interactive_shell()
+        
+        # Detach each handle before closing it, so a second disconnect (tab
+        # close, then app quit) never closes the same socket twice
+        for name in ('command_shell', 'sftp_client', 'ssh_client'):
+            handle = getattr(self, name)
+            setattr(self, name, None)
+            if handle:
+                try:
+                    if name == 'ssh_client':
+                        # Other tabs may still be using the connection
+                        self._release_pooled(handle)
+                    else:
+                        handle.close()
+                except:
+                    pass
+        
+        self.transport = None
+        self.home_path = None
+        self.dir_cache.clear()
+    
+    def execute_user_command(self, command):
+        """
+        Executes a user-command and returns output, error, and return code.
+        This will put the output in the shell
+        """
+        if not self.ssh_client:
+            raise Exception("Not connected to SSH server")
+        
+        # Typed commands get their own channel rather than the command shell:
+        # they may legitimately run quiet for a long time (sleep, du, tar),
+        # so they're waited on without COMMAND_TIMEOUT and can't cost the
+        # shared shell used by listings and ps
+        stdout, stderr, return_code = self._execute_in_channel(command)
+        # A typed command (rm, mv, touch, ...) can change any directory
+        self.invalidate_dir_cache()
+        # One entry per command, so a long output can't push earlier commands
+        # out of history; only its tail is kept, as that's what gets shown
+        self.history.append(HistoryEntry(command, stdout[-self.HISTORY_OUTPUT_LIMIT:], return_code))
+        return stdout, stderr, return_code
+    
+    def get_user_command_history(self):
+        return self.history
+
+    def execute_command(self, command):
+        """Execute a command and return output, error, and return code"""
+        if not self.ssh_client:
+            raise Exception("Not connected to SSH server")
+        
+        # Worker threads can run commands at the same time. The command shell
+        # serves one at a time, so a caller that finds it busy takes a fresh
+        # channel rather than queueing behind a slow command.
+        if self.command_lock.acquire(blocking=False):
+            try:
+                if self.command_shell is None and self.command_shell_reopens > 0:
+                    # The last shell timed out or dropped; one new channel now
+                    # saves opening a channel for every command after this
+                    self.command_shell_reopens -= 1
+                    self._open_command_shell()
+                if self.command_shell is not None:
+                    return self._execute_in_command_shell(command)
+            finally:
+                self.command_lock.release()
+        
+        return self._execute_in_channel(command)
+
+    def _execute_in_channel(self, command):
+        """Run a command on its own channel, waiting as long as it takes"""
+        try:
+            stdout_data = bytearray()
+            stderr_data = bytearray()
+            return_code = 1
+            for stream, data in self.stream_command(command):
+                if stream == 'stdout':
+                    stdout_data += data
+                elif stream == 'stderr':
+                    stderr_data += data
+                else:
+                    return_code = data
+            
+            return _decode_output(stdout_data), _decode_output(stderr_data), return_code
+            
+        except Exception as e:
+            return "", str(e), 1
+
+    def stream_command(self, command):
+        """
+        Run a command on its own channel, yielding ('stdout', bytes) and
+        ('stderr', bytes) chunks as they arrive, then ('exit', return_code)
+        """
+        if not self.ssh_client:
+            raise Exception("Not connected to SSH server")
+        
+        channel = self.transport.open_session()
+        try:
+            channel.set_combine_stderr(False)
+            channel.exec_command(command)
+            
+            # Drain both streams as they become ready, so a chatty stderr can't
+            # fill its window and stall the command while we wait on stdout
+            while True:
+                select.select([channel], [], [], 0.5)
+                if channel.recv_ready():
+                    yield 'stdout', channel.recv(65536)
+                if channel.recv_stderr_ready():
+                    yield 'stderr', channel.recv_stderr(65536)
+                if (channel.exit_status_ready() and not channel.recv_ready()
+                        and not channel.recv_stderr_ready()):
+                    break
+            
+            yield 'exit', channel.recv_exit_status()
+        finally:
+            channel.close()
+
+    def _open_command_shell(self):
+        """
+        Start a long-lived, non-interactive shell for execute_command to reuse,
+        so each command doesn't pay for opening a fresh channel. It's a plain
+        POSIX sh, which is all the app's own commands need; typed commands run
+        under the login shell on their own channel instead.
+        """
+        try:
+            channel = self.transport.open_session()
+            channel.exec_command('sh')
+            self.command_marker = f"{self.COMMAND_SENTINEL}{secrets.token_hex(8)}_"
+            self.command_shell = channel
+            return True
+        except Exception:
+            self.command_shell = None  # execute_command falls back to exec_command
+            return False
+
+    def _execute_in_command_shell(self, command):
+        """Run a command through the command shell and wait for its sentinel"""
+        channel = self.command_shell
+        marker = self.command_marker
+        
+        # The subshell keeps `cd`/`exit` from leaking into later commands, and
+        # /dev/null stops it from reading the commands that follow as input.
+        # The command reaches eval as one quoted word, so a stray quote or an
+        # unterminated heredoc is a syntax error there rather than swallowing
+        # the sentinel lines below.
+        script = (
+            f"( eval {shlex.quote(command)} ) </dev/null\n"
+            f"printf '\\n{marker}%d\\n' $?\n"
+            f"printf '\\n{marker}\\n' >&2\n"
+        )
+        try:
+            channel.sendall(script.encode('utf-8'))
+        except Exception:
+            # Nothing ran yet, so it's safe to retry on a fresh channel
+            self.command_shell = None
+            return self.execute_command(command)
+        
+        out_marker = f'\n{marker}'.encode()
+        err_marker = f'\n{marker}\n'.encode()
+        stdout = bytearray()
+        stderr = bytearray()
+        return_code = None
+        stderr_done = False
+        deadline = time.monotonic() + self.COMMAND_TIMEOUT
+        
+        try:
+            while return_code is None or not stderr_done:
+                select.select([channel], [], [], 0.5)
+                if not channel.recv_ready() and not channel.recv_stderr_ready():
+                    if channel.closed or channel.exit_status_ready():
+                        raise Exception("Command shell closed unexpectedly")
+                    if time.monotonic() > deadline:
+                        raise Exception(f"Command timed out after {self.COMMAND_TIMEOUT}s")
+                    continue
+                deadline = time.monotonic() + self.COMMAND_TIMEOUT
+                
+                if channel.recv_ready():
+                    stdout += channel.recv(65536)
+                    if return_code is None and stdout.endswith(b'\n'):
+                        # The sentinel line is always the last thing on stdout
+                        idx = stdout.rfind(out_marker, max(0, len(stdout) - len(out_marker) - 16))
+                        if idx >= 0:
+                            return_code = int(stdout[idx + len(out_marker):-1])
+                            del stdout[idx:]
+                
+                if channel.recv_stderr_ready():
+                    stderr += channel.recv_stderr(65536)
+                    if stderr.endswith(err_marker):
+                        del stderr[-len(err_marker):]
+                        stderr_done = True
+        
+        except Exception as e:
+            # The shell is in an unknown state; later commands use a new channel
+            try:
+                channel.close()
+            except:
+                pass
+            self.command_shell = None
+            return "", str(e), 1
+        
+        return _decode_output(stdout), _decode_output(stderr), return_code
+
+    def list_directory(self, path=None, force=False):
+        """List directory contents, over SFTP when available"""
+        if not self.ssh_client:
+            raise Exception("Not connected to SSH server")
+        
+        return list(self.iter_directory(path, force))
+    
+    def iter_directory(self, path=None, force=False):
+        """
+        Yield directory entries as they arrive, over SFTP when available.
+        A listing fetched within DIR_CACHE_TTL seconds is replayed from memory
+        unless force is set.
+        """
+        if not self.ssh_client:
+            raise Exception("Not connected to SSH server")
+        
+        target_path = path or self.current_path
+        
+        if not force:
+            cached = self.dir_cache.get(target_path)
+            if cached and time.monotonic() - cached[1] < self.DIR_CACHE_TTL:
+                try:
+                    self.dir_cache.move_to_end(target_path)
+                except KeyError:
+                    pass  # Invalidated meanwhile by a command on another thread
+                yield from cached[0]
+                return
+        
+        # Only a listing that was read to the end is cached, and only if no
+        # command invalidated the cache while it was being read
+        generation = self.dir_cache_generation
+        entries = []
+        for entry in self._iter_directory_remote(target_path):
+            entries.append(entry)
+            yield entry
+        
+        if generation != self.dir_cache_generation:
+            return
+        self.dir_cache[target_path] = (entries, time.monotonic())
+        self.dir_cache.move_to_end(target_path)
+        if len(self.dir_cache) > self.DIR_CACHE_SIZE:
+            self.dir_cache.popitem(last=False)
+    
+    def invalidate_dir_cache(self):
+        """Forget every cached listing, after something may have changed files"""
+        self.dir_cache_generation += 1
+        self.dir_cache.clear()
+    
+    def _iter_directory_remote(self, target_path):
+        """Yield directory entries read from the server"""
+        if self.sftp_client:
+            # Already loaded by connect()
+            from paramiko import SFTPError
+            
+            yielded = False
+            try:
+                with self.sftp_lock:
+                    attrs = self.sftp_client.listdir_iter(target_path)
+                    try:
+                        for attr in attrs:
+                            yielded = True
+                            yield self._sftp_entry(attr)
+                    finally:
+                        # Closed early by a stopped listing; read the rest so
+                        # no replies are left queued and the handle is closed
+                        try:
+                            for attr in attrs:
+                                pass
+                        except:
+                            pass
+                return
+            except (IOError, EOFError, SFTPError) as e:
+                if yielded:
+                    raise
+                # A missing or unreadable directory would fail under ls too,
+                # so don't pay for a second round trip to find that out
+                if getattr(e, 'errno', None) in (errno.ENOENT, errno.EACCES):
+                    raise Exception(f"Failed to list directory: {e.strerror}")
+                # Protocol errors or a dropped SFTP session; fall back to a
+                # listing command over the command shell
+        
+        entries = self._list_directory_find(target_path)
+        if entries is not None:
+            yield from entries
+            return
+        
+        # No GNU find on the server; parse ls output instead
+        yield from self._list_directory_ls(target_path)
+    
+    def _sftp_entry(self, attr):
+        """Build a directory entry from an SFTPAttributes"""
+        mode = attr.st_mode
+        
+        # Determine file type from the format bits in one lookup
+        file_type = _IFMT_TYPES.get(mode & 0o170000)
+        if file_type is None:
+            file_type = 'executable' if mode & 0o111 else 'file'
+        
+        return {
+            'name': attr.filename,
+            'type': file_type,
+            'permissions': stat.filemode(mode),
+            'size': attr.st_size,
+            'raw_line': attr.longname
+        }
+    
+    def _list_directory_find(self, target_path):
+        """
+        List directory contents with GNU find, or return None if that fails.
+        Each entry is printed as tab-separated fields ending in a NUL, so any
+        name (spaces, newlines and all) comes back exactly.
+        """
+        command = (f"find {shlex.quote(target_path)} -mindepth 1 -maxdepth 1 "
+                   f"-printf '%y\\t%M\\t%s\\t%f\\0'")
+        stdout, stderr, return_code = self.execute_command(command)
+        
+        if return_code != 0:
+            return None
+        
+        items = []
+        for record in stdout.split('\0'):
+            fields = record.split('\t', 3)
+            if len(fields) < 4:
+                continue
+            find_type, permissions, size, name = fields
+            
+            if find_type == 'd':
+                file_type = 'directory'
+            elif find_type == 'l':
+                file_type = 'link'
+            elif 'x' in permissions:
+                file_type = 'executable'
+            else:
+                file_type = 'file'
+            
+            items.append({
+                'name': name,
+                'type': file_type,
+                'permissions': permissions,
+                'size': int(size),
+                'raw_line': record
+            })
+        
+        return items
+    
+    def _list_directory_ls(self, target_path):
+        """Yield directory entries parsed from the ls command"""
+        # Use ls -la for detailed listing. The C locale pins the date to the
+        # three fields _LS_LINE expects, whatever the server's locale is.
+        command = f"LC_ALL=C ls -la {shlex.quote(target_path)}"
+        stdout, stderr, return_code = self.execute_command(command)
+        
+        if return_code != 0:
+            raise Exception(f"Failed to list directory: {stderr}")
+        
+        # Parse ls output
+        lines = iter(stdout.splitlines())
+        next(lines, None)  # Skip first line (total)
+        
+        for line in lines:
+            match = _LS_LINE.match(line)
+            if not match:
+                continue
+            
+            permissions, size, name = match.groups()
+            # Convert once here, so the view never has to parse sizes
+            try:
+                size = int(size)
+            except ValueError:
+                pass
+            
+            # Skip current and parent directory entries
+            if name in ['.', '..']:
+                continue
+            
+            # Determine file type
+            if permissions.startswith('d'):
+                file_type = 'directory'
+            elif permissions.startswith('l'):
+                file_type = 'link'
+            elif 'x' in permissions:
+                file_type = 'executable'
+            else:
+                file_type = 'file'
+            
+            yield {
+                'name': name,
+                'type': file_type,
+                'permissions': permissions,
+                'size': size,
+                'raw_line': line
+            }
+    
+    def change_directory(self, path):
+        """Change current directory, checking it exists on the server"""
+        if not self.ssh_client:
+            raise Exception("Not connected to SSH server")
+        
+        # Expand ~ locally from the cached home directory
+        if path == '~' or path.startswith('~/'):
+            path = self.get_home_directory() + path[1:]
+        
+        # Remote paths are always POSIX, whatever OS we're running on.
+        # posixpath.join keeps absolute paths as they are, and normpath
+        # resolves '..' (including '/..' -> '/') without a special case.
+        new_path = posixpath.normpath(posixpath.join(self.current_path, path))
+        
+        if self.sftp_client:
+            # Already loaded by connect()
+            from paramiko import SFTPError
+            
+            # Check the path with a single SFTP stat. new_path is already
+            # absolute and normalised, so there's nothing for a normalize
+            # round trip to add; like `cd`, symlinked dirs keep their own path.
+            # Listings always pass an explicit path, so the SFTP session's own
+            # cwd is never needed.
+            try:
+                with self.sftp_lock:
+                    attr = self.sftp_client.stat(new_path)
+            except (IOError, EOFError, SFTPError) as e:
+                if getattr(e, 'errno', None) is not None:
+                    raise Exception(f"Cannot access directory: {e}")
+                # The SFTP session itself is in trouble; ask the shell instead
+                attr = None
+            
+            if attr is not None:
+                if not stat.S_ISDIR(attr.st_mode):
+                    raise Exception(f"Cannot access directory: {new_path} is not a directory")
+                
+                self.current_path = new_path
+                return self.current_path
+        
+        # Test directory access. Quote the path so names containing a quote
+        # or other shell characters reach cd intact
+        command = f"cd {shlex.quote(new_path)} && pwd"
+        stdout, stderr, return_code = self.execute_command(command)
+        
+        if return_code != 0:
+            raise Exception(f"Cannot access directory: {stderr}")
+        
+        # Update current path
+        self.current_path = stdout.strip()
+        
+        return self.current_path
+    
+    def get_processes(self):
+        """Get top CPU-consuming processes"""
+        if not self.ssh_client:
+            raise Exception("Not connected to SSH server")
+        
+        return list(self.iter_processes())
+    
+    def iter_processes(self):
+        """Yield top CPU-consuming processes as they are parsed"""
+        if not self.ssh_client:
+            raise Exception("Not connected to SSH server")
+        
+        # Ask for exactly the _PS_KEYS columns, with no header to skip; the
+        # command line comes last so it can keep its spaces
+        ps_command = "ps -eo user,pid,pcpu,pmem,vsz,rss,tty,stat,start_time,time,args --sort=-pcpu --no-headers"
+        stdout, stderr, return_code = self.execute_command(f"{ps_command} | head -n 15")
+        
+        if return_code != 0:
+            raise Exception(f"Failed to get processes: {stderr}")
+        
+        count = 0
+        for line in stdout.splitlines():
+            parts = line.split(None, 10)  # Split on whitespace, max 11 parts
+            # ps lists itself, often near the top on an idle host; skip it
+            if len(parts) < 11 or parts[10] == ps_command:
+                continue
+
+            try:
+                cpu = float(parts[2])
+                mem = float(parts[3])
+            except ValueError:
+                continue
+            
+            # One extra row was fetched to make up for a skipped ps row
+            count += 1
+            if count > 14:
+                break
+            yield Process(parts[0], parts[1], cpu, mem, *parts[4:])
+    
+    def _probe_session(self):
+        """Fetch the home and login directories with a single command"""
+        stdout, stderr, return_code = self.execute_command('printf "%s\\n" "$HOME" "$(pwd)"')
+        lines = stdout.splitlines() if return_code == 0 else []
+        
+        if len(lines) == 2 and lines[0]:
+            self.home_path = lines[0]
+        else:
+            self.home_path = f"/home/{self.connection_info.get('username', '')}"
+        self.current_path = lines[1] if len(lines) == 2 and lines[1] else self.home_path
+    
+    def get_home_directory(self):
+        """Get user's home directory, resolved once per connection"""
+        if not self.ssh_client:
+            raise Exception("Not connected to SSH server")
+        
+        if self.home_path:
+            return self.home_path
+        
+        stdout, stderr, return_code = self.execute_command('echo $HOME')
+        if return_code == 0 and stdout:
+            self.home_path = stdout
+        else:
+            # Fallback, cached too so Home doesn't retry the failing query
+            self.home_path = f"/home/{self.connection_info.get('username', '')}"
+        return self.home_path
+    
+    def get_current_path(self):
+        """Get current working directory"""
+        return self.current_path
+    
+    def is_connected(self):
+        """Check if SSH connection is active"""
+        transport = self.transport
+        return transport is not None and transport.is_active()
@@ -1,340 +1,106 @@
-import sys
-import json
 import os
-import stat
-import appdirs
+import sys
 import collections
+from operator import itemgetter
 
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, 
                              QListWidget, QListWidgetItem, QPushButton, QLabel,
                              QMessageBox, QLineEdit, QFormLayout,
-                             QTextEdit, QSplitter, QProgressBar, QTabWidget,
-                             QMainWindow, QTabBar, QStackedWidget)
+                             QPlainTextEdit, QSplitter, QProgressBar, QTabWidget,
+                             QMainWindow, QTabBar, QStackedWidget, QStyle, QListView)
 
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
-from PyQt5.QtGui import QFont, QIcon
-import paramiko
-from datetime import datetime
+from PyQt5.QtCore import (Qt, QThread, pyqtSignal, QTimer, QSize,
+                          QAbstractListModel, QModelIndex)
+from PyQt5.QtGui import QBrush, QFont, QIcon, QFontMetrics, QTextCursor
 
+from ssh_client import SSHClient
 
 
+# Process list row layout. printf-style, which formats these rows nearly
+# twice as fast as the equivalent str.format template
+_PROC_FMT = "PID: %-8s CPU: %-5.1f%% %-10s MEM: %-5.1f%% %-10s USER: %-10s CMD: %s"
 
+# Usage bars for 0-100%, one block per 10%, built once
+_USAGE_BARS = tuple("█" * n for n in range(11))
 
-class SSHClient:
-    """Handles SSH connection and remote operations"""
 
-    DATA_DIR = appdirs.user_data_dir("shhwomper", "shhwomper")
-    os.makedirs(DATA_DIR, exist_ok=True)
-    SAVE_PATH = os.path.join(DATA_DIR, "saved_clients.json")
+def _usage_bar(percent):
+    """Bar for a CPU or memory percentage"""
+    # Multi-threaded processes can report over 100% CPU
+    return _USAGE_BARS[min(int(percent / 10), 10)] if percent > 0 else ""
 
-    def __init__(self):
-        self.ssh_client = None
-        self.sftp_client = None
-        self.current_path = None
-        self.history = collections.deque(maxlen=200)
-        self.connection_info = {}
-
-    def connect(self, hostname, username, password=None, port=22):
-        """Establish SSH connection"""
-        try:
-            self.ssh_client = paramiko.SSHClient()
-            self.ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
-            self.connection_info = {
-                'hostname': hostname,
-                'username': username,
-                'port': port
-            }
-
-            if password:
-                self.connection_info['password'] = password
-
-            # Connect
-            self.ssh_client.connect(
-                hostname=hostname,
-                port=port,
-                username=username,
-                password=password,
-                timeout=10
-            ) if password else self.ssh_client.connect(
-                hostname=hostname,
-                port=port,
-                username=username,
-                timeout=10
-            )
 
-            # Verify connection
-            stdin, stdout, stderr = self.ssh_client.exec_command('whoami')
-            result = stdout.read().decode().strip()
+# Monospace font shared by every command line; QFont needs a running
+# QApplication, so it's made on first use
+_MONO_FONT = None
 
-            if result != username:
-                raise Exception("Authentication verification failed")
 
-            self.sftp_client = self.ssh_client.open_sftp()
-            self.current_path = self.sftp_client.getcwd() or '/'
+def _get_mono_font():
+    global _MONO_FONT
+    if _MONO_FONT is None:
+        _MONO_FONT = QFont('Courier', 10)
+    return _MONO_FONT
 
-            # send a keepalive message every 30 seconds so our session doesnt timeout.
-            self.ssh_client.get_transport().set_keepalive(30)
 
-            # Save this client if it's new
-            self._save_client(self.connection_info)
-
-            return True
-
-        except Exception as e:
-            self.disconnect()
-            raise e
-
-    @classmethod
-    def _save_client(cls, info):
-        """Save client info to disk if it's not already saved"""
-        existing = cls.get_saved_clients()
-
-        # Don't save password field for matching
-        compare_info = {k: v for k, v in info.items() if k != 'password'}
-        if compare_info not in [{k: v for k, v in c.items() if k != 'password'} for c in existing]:
-            existing.append(info)
-            try:
-                with open(cls.SAVE_PATH, 'w') as f:
-                    json.dump(existing, f, indent=2)
-            except Exception as e:
-                print(f"Failed to save client: {e}")
-
-    @classmethod
-    def get_saved_clients(cls):
-        """Retrieve all saved SSH clients"""
-        if not os.path.exists(cls.SAVE_PATH):
-            return []
-        try:
-            with open(cls.SAVE_PATH, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Failed to load clients: {e}")
-            return []
-    
-    @classmethod
-    def start_saved_client(cls, connection_info):
-        """Creates a SSHClient for all saved clients"""
-        cl = SSHClient()
-        cl.connect(
-            connection_info["hostname"], 
-            connection_info["username"],
-            connection_info.get("password", None),
-            connection_info["port"],
-        )
-        return cl
-
-    def disconnect(self):
-        """Close SSH and SFTP connections"""
-        if self.sftp_client:
-            try:
-                self.sftp_client.close()
-            except:
-                pass
-            self.sftp_client = None
-        
-        if self.ssh_client:
-            try:
-                self.ssh_client.close()
-            except:
-                pass
-            self.ssh_client = None
-    
-    def execute_user_command(self, command):
-        """
-        Executes a user-command and returns output, error, and return code.
-        This will put the output in the shell
-        """
-        self.history.append(command)
-        stdout, stderr, return_code = self.execute_command(command)
-        for s in stdout.splitlines():
-            self.history.append(s)
-        return stdout, stderr, return_code
-    
-    def get_user_command_history(self):
-        return self.history
-
-    def execute_command(self, command):
-        """Execute a command and return output, error, and return code"""
-        if not self.ssh_client:
-            raise Exception("Not connected to SSH server")
-        
-        try:
-            stdin, stdout, stderr = self.ssh_client.exec_command(command)
-            
-            stdout_data = stdout.read().decode().strip()
-            stderr_data = stderr.read().decode().strip()
-            return_code = stdout.channel.recv_exit_status()
-            
-            return stdout_data, stderr_data, return_code
-            
-        except Exception as e:
-            return "", str(e), 1
+# Units used by format_file_size
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
 
 
-    def list_directory(self, path=None):
-        """List directory contents using ls command"""
-        if not self.ssh_client:
-            raise Exception("Not connected to SSH server")
-        
-        target_path = path or self.current_path
-        
-        # Use ls -la for detailed listing
-        command = f"ls -la '{target_path}'"
-        stdout, stderr, return_code = self.execute_command(command)
-        
-        if return_code != 0:
-            raise Exception(f"Failed to list directory: {stderr}")
-        
-        # Parse ls output
-        items = []
-        lines = stdout.split('\n')
-        
-        for line in lines[1:]:  # Skip first line (total)
-            if not line.strip():
-                continue
-            
-            # Parse ls -la output
-            parts = line.split()
-            if len(parts) < 9:
-                continue
-            
-            permissions = parts[0]
-            size = parts[4]
-            name = ' '.join(parts[8:])  # Handle names with spaces
-            
-            # Skip current and parent directory entries
-            if name in ['.', '..']:
-                continue
-            
-            # Determine file type
-            if permissions.startswith('d'):
-                file_type = 'directory'
-            elif permissions.startswith('l'):
-                file_type = 'link'
-            elif 'x' in permissions:
-                file_type = 'executable'
-            else:
-                file_type = 'file'
-            
-            items.append({
-                'name': name,
-                'type': file_type,
-                'permissions': permissions,
-                'size': size,
-                'raw_line': line
-            })
-        
-        return items
-    
-    def change_directory(self, path):
-        """Change current directory using cd command"""
-        if not self.ssh_client:
-            raise Exception("Not connected to SSH server")
-        
-        # Handle relative paths
-        if path == '..':
-            new_path = os.path.dirname(self.current_path.rstrip('/'))
-            if not new_path:
-                new_path = '/'
-        elif path.startswith('/'):
-            new_path = path
-        else:
-            new_path = os.path.join(self.current_path, path)
-        
-        # Normalize path
-        new_path = os.path.normpath(new_path).replace('\\', '/')
-        if not new_path.startswith('/'):
-            new_path = '/' + new_path
-        
-        # Test directory access
-        command = f"cd '{new_path}' && pwd"
-        stdout, stderr, return_code = self.execute_command(command)
-        
-        if return_code != 0:
-            raise Exception(f"Cannot access directory: {stderr}")
-        
-        # Update current path
-        self.current_path = stdout.strip()
-        
-        # Also update SFTP client path
-        if self.sftp_client:
-            try:
-                self.sftp_client.chdir(self.current_path)
-            except:
-                pass  # SFTP path update is not critical
-        
-        return self.current_path
-    
-    def get_processes(self):
-        """Get top CPU-consuming processes"""
-        if not self.ssh_client:
-            raise Exception("Not connected to SSH server")
-        
-        command = "ps aux --sort=-%cpu | head -n 15"
-        stdout, stderr, return_code = self.execute_command(command)
-        
-        if return_code != 0:
-            raise Exception(f"Failed to get processes: {stderr}")
-        
-        processes = []
-        lines = stdout.split('\n')
-        
-        # Skip header line
-        for line in lines[1:]:
-            if not line.strip():
-                continue
-            
-            # Parse ps aux output
-            parts = line.split(None, 10)  # Split on whitespace, max 11 parts
-            if len(parts) < 11:
-                continue
-
-            try:
-                process = {
-                    'user': parts[0],
-                    'pid': parts[1],
-                    'cpu': float(parts[2]),
-                    'mem': float(parts[3]),
-                    'vsz': parts[4],
-                    'rss': parts[5],
-                    'tty': parts[6],
-                    'stat': parts[7],
-                    'start': parts[8],
-                    'time': parts[9],
-                    'command': parts[10]
-                }
-                processes.append(process)
-            except (ValueError, IndexError):
-                continue
-        
-        return processes
-    
-    def get_home_directory(self):
-        """Get user's home directory"""
-        if not self.ssh_client:
-            raise Exception("Not connected to SSH server")
-        
-        stdout, stderr, return_code = self.execute_command('echo $HOME')
-        if return_code == 0 and stdout:
-            return stdout.strip()
-        
-        # Fallback
-        return f"/home/{self.connection_info.get('username', '')}"
-    
-    def get_current_path(self):
-        """Get current working directory"""
-        return self.current_path
+def format_file_size(size_bytes):
+    """Format file size in human readable format"""
+    # Sizes arrive as ints already; a string is an ls size that wasn't a
+    # plain number (e.g. a device's "major, minor"), shown as it came
+    if not isinstance(size_bytes, int):
+        return size_bytes if isinstance(size_bytes, str) else "?"
+    if size_bytes == 0:
+        return "0B"
     
-    def is_connected(self):
-        """Check if SSH connection is active"""
-        return self.ssh_client is not None and self.ssh_client.get_transport() is not None
-
-
-
+    # Each unit is 10 more bits, so the bit length picks it directly
+    i = min((size_bytes.bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (i * 10)):.1f}{_SIZE_UNITS[i]}"
+
+
+# Tab chrome styles, built once and set on the widgets they style rather than
+# on the whole tab, so the nav bar's rules aren't matched against every page
+_NAV_BAR_STYLE = """
+QListWidget#navBar {
+    background-color: #2d2d2d;
+    border: 1px solid #444444;
+    outline: 0;
+}
+
+QListWidget#navBar::item {
+    background-color: #3d3d3d;
+    color: #ffffff;
+    padding: 12px 8px;
+    margin: 2px 4px;
+    border: 1px solid #555555;
+    border-radius: 5px;
+}
+
+QListWidget#navBar::item:hover {
+    background-color: #4d4d4d;
+    border: 1px solid #666666;
+}
+
+QListWidget#navBar::item:selected {
+    background-color: #0078d4;
+    color: white;
+    border: 1px solid #005a9e;
+}
+"""
+
+_CONTENT_AREA_STYLE = """
+QStackedWidget#contentArea {
+    background-color: #ffffff;
+    border: 1px solid #cccccc;
+}
+"""
 
 
 class SSHWidget(QWidget):
+    disconnect_requested = pyqtSignal(QWidget)  # This tab, to be closed
+    
     def __init__(self, ssh_client):
         super().__init__()
         self.ssh_client = ssh_client
@@ -358,9 +124,17 @@ class SSHWidget(QWidget):
 
         self.stacked_widget = QStackedWidget()
         self.stacked_widget.setObjectName("contentArea")
+        # Style before the pages are added, so they're polished only once
+        self.apply_stylesheet()
+
+        directory_explorer = DirectoryExplorer(self.ssh_client)
+        processes_explorer = ProcessExplorer(self.ssh_client)
+        # Either page's Disconnect button closes the whole tab
+        for explorer in (directory_explorer, processes_explorer):
+            explorer.disconnect_requested.connect(lambda: self.disconnect_requested.emit(self))
 
-        self.directory_widget = self.create_explorer_with_terminal(DirectoryExplorer(self.ssh_client))
-        self.processes_widget = self.create_explorer_with_terminal(ProcessExplorer(self.ssh_client))
+        self.directory_widget = self.create_explorer_with_terminal(directory_explorer)
+        self.processes_widget = self.create_explorer_with_terminal(processes_explorer)
 
         self.stacked_widget.addWidget(self.directory_widget)
         self.stacked_widget.addWidget(self.processes_widget)
@@ -369,7 +143,6 @@ class SSHWidget(QWidget):
         main_layout.addWidget(self.stacked_widget, 1)
 
         self.nav_bar.currentRowChanged.connect(self.stacked_widget.setCurrentIndex)
-        self.apply_stylesheet()
 
         if self.nav_bar.count() > 0:
             self.nav_bar.setCurrentRow(0)
@@ -395,50 +168,46 @@ class SSHWidget(QWidget):
         return container
 
     def apply_stylesheet(self):
-        style = """
-            QListWidget#navBar {
-                background-color: #2d2d2d;
-                border: 1px solid #444444;
-                outline: 0;
-            }
-
-            QListWidget#navBar::item {
-                background-color: #3d3d3d;
-                color: #ffffff;
-                padding: 12px 8px;
-                margin: 2px 4px;
-                border: 1px solid #555555;
-                border-radius: 5px;
-            }
-
-            QListWidget#navBar::item:hover {
-                background-color: #4d4d4d;
-                border: 1px solid #666666;
-            }
-
-            QListWidget#navBar::item:selected {
-                background-color: #0078d4;
-                color: white;
-                border: 1px solid #005a9e;
-            }
-
-            QStackedWidget#contentArea {
-                background-color: #ffffff;
-                border: 1px solid #cccccc;
-            }
-        """
-        self.setStyleSheet(style)
-
-    def disconnect_tab(self, widget):
-        if hasattr(self, 'parent_window'):
-            self.parent_window.disconnect_tab(self)
-        else:
-            self.ssh_client.disconnect()
-            self.close()
+        self.nav_bar.setStyleSheet(_NAV_BAR_STYLE)
+        self.stacked_widget.setStyleSheet(_CONTENT_AREA_STYLE)
 
 
 
 
+class SSHConnectWorker(QThread):
+    """QThread for opening an SSH connection without blocking the UI"""
+    
+    # Signals for communicating with main thread
+    connected = pyqtSignal(object)  # Connected SSHClient
+    failed = pyqtSignal(str, str)   # Error title, message
+    
+    def __init__(self, hostname, username, password, port):
+        super().__init__()
+        self.hostname = hostname
+        self.username = username
+        self.password = password
+        self.port = port
+    
+    def run(self):
+        import paramiko
+        
+        try:
+            # Create and test SSH connection
+            ssh_client = SSHClient()
+            ssh_client.connect(self.hostname, self.username, self.password, self.port)
+            # The client is a QObject created on this worker thread; hand it to
+            # the GUI thread so its shell signals are delivered after we exit
+            ssh_client.moveToThread(QApplication.instance().thread())
+            self.connected.emit(ssh_client)
+            
+        except paramiko.AuthenticationException:
+            self.failed.emit('Authentication Failed', 'Invalid username or password.')
+        except paramiko.SSHException as e:
+            self.failed.emit('SSH Error', f'SSH connection failed:\n{str(e)}')
+        except Exception as e:
+            self.failed.emit('Connection Failed', f'Failed to connect:\n{str(e)}')
+
+
 class SSHLoginWidget(QWidget):
     """Widget for SSH connection setup (embedded in tab)"""
     
@@ -446,6 +215,7 @@ class SSHLoginWidget(QWidget):
     
     def __init__(self):
         super().__init__()
+        self.connect_worker = None
         self.init_ui()
     
     def init_ui(self):
@@ -514,6 +284,9 @@ class SSHLoginWidget(QWidget):
     
     def attempt_connection(self):
         """Attempt SSH connection"""
+        if self.connect_worker and self.connect_worker.isRunning():
+            return
+        
         hostname = self.hostname_input.text().strip()
         username = self.username_input.text().strip()
         password = self.password_input.text().strip()
@@ -523,39 +296,64 @@ class SSHLoginWidget(QWidget):
             QMessageBox.warning(self, 'Error', 'Please enter both hostname and username')
             return
         
-        # Show progress
+        # Show progress; the bar animates since the event loop keeps running
         self.progress_bar.setVisible(True)
         self.progress_bar.setRange(0, 0)
         self.connect_button.setEnabled(False)
-        QApplication.processEvents()
         
-        try:
-            # Create and test SSH connection
-            ssh_client = SSHClient()
-            ssh_client.connect(hostname, username, password if password else None, port)
-            
-            # Emit success signal with SSH client
-            self.connection_successful.emit(ssh_client)
-            
-        except paramiko.AuthenticationException:
-            QMessageBox.critical(self, 'Authentication Failed', 'Invalid username or password.')
-        except paramiko.SSHException as e:
-            QMessageBox.critical(self, 'SSH Error', f'SSH connection failed:\n{str(e)}')
-        except Exception as e:
-            QMessageBox.critical(self, 'Connection Failed', f'Failed to connect:\n{str(e)}')
-        finally:
-            # Hide progress
-            self.progress_bar.setVisible(False)
-            self.connect_button.setEnabled(True)
+        self.connect_worker = SSHConnectWorker(hostname, username, password if password else None, port)
+        self.connect_worker.connected.connect(self.on_connected)
+        self.connect_worker.failed.connect(self.on_connection_failed)
+        self.connect_worker.finished.connect(self.on_connect_finished)
+        self.connect_worker.start()
+    
+    def on_connected(self, ssh_client):
+        """Emit success signal with SSH client"""
+        self.connection_successful.emit(ssh_client)
+    
+    def on_connection_failed(self, title, message):
+        QMessageBox.critical(self, title, message)
+    
+    def on_connect_finished(self):
+        # Hide progress
+        self.progress_bar.setVisible(False)
+        self.connect_button.setEnabled(True)
+
 
 
 
 
+class ProcessListWorker(QThread):
+    """QThread for fetching the process list without blocking the UI"""
+    
+    # Signals for communicating with main thread
+    processes_received = pyqtSignal(list)  # Process tuples
+    error_occurred = pyqtSignal(str)       # Error messages
+    
+    def __init__(self, ssh_client):
+        super().__init__()
+        self.ssh_client = ssh_client
+    
+    def run(self):
+        try:
+            self.processes_received.emit(self.ssh_client.get_processes())
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+
 
 class ProcessExplorer(QWidget):
+    disconnect_requested = pyqtSignal()
+    
     def __init__(self, ssh_client):
         super().__init__()
         self.ssh_client = ssh_client
+        self.all_processes = []
+        self.process_items = []  # QListWidgetItem per entry of all_processes
+        self.lc_commands = []    # Lowercased command per entry, for filtering
+        # Row highlights for busy processes, shared by every item
+        self.high_cpu_brush = QBrush(Qt.red)
+        self.mid_cpu_brush = QBrush(Qt.yellow)
+        self.process_worker = None
         self.init_ui()
         self.refresh_processes()
     
@@ -594,12 +392,23 @@ class ProcessExplorer(QWidget):
         nav_layout.addWidget(self.disconnect_button)
         
         self.process_list = QListWidget()
+        # One monospace font for the whole list, rather than a QFont per item;
+        # rows are single unwrapped lines of the same height
+        self.process_list.setFont(QFont('Courier', 9))
+        self.process_list.setUniformItemSizes(True)
         self.process_list.itemSelectionChanged.connect(self.on_selection_changed)
         
         filter_layout = QHBoxLayout()
         filter_layout.addWidget(QLabel("Filter by name:"))
         self.filter_input = QLineEdit()
-        self.filter_input.textChanged.connect(self.filter_processes)
+        # Filter once typing pauses, rather than on every keystroke
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(150)
+        self.filter_timer.timeout.connect(self.filter_processes)
+        self.filter_input.textChanged.connect(lambda _: self.filter_timer.start())
+        # Enter applies the filter straight away instead of waiting out the delay
+        self.filter_input.returnPressed.connect(self.apply_filter_now)
         self.filter_input.setPlaceholderText("Enter process name to filter...")
         filter_layout.addWidget(self.filter_input)
         
@@ -609,56 +418,79 @@ class ProcessExplorer(QWidget):
         main_layout.addLayout(filter_layout, stretch=1)
         
         self.setLayout(main_layout)
-        
-        conn_info = self.ssh_client.connection_info
-        connection_text = f'{conn_info["username"]}@{conn_info["hostname"]}:{conn_info["port"]}'
     
     def refresh_processes(self):
-        try:
-            self.process_list.clear()
-            
-            processes = self.ssh_client.get_processes()
-            self.all_processes = processes
-            
-            self.populate_process_list(processes)
-            
-            self.process_count_label.setText(f"Processes: {len(processes)}")
-            
-        except Exception as e:
-            error_msg = f"Failed to get processes: {str(e)}"
-            QMessageBox.warning(self, "Error", error_msg)
+        # Fetch on a worker, so a slow server doesn't freeze every tab
+        if self.process_worker and self.process_worker.isRunning():
+            return
+        
+        self.refresh_button.setEnabled(False)
+        self.process_worker = ProcessListWorker(self.ssh_client)
+        self.process_worker.processes_received.connect(self.on_processes_received)
+        self.process_worker.error_occurred.connect(self.on_processes_error)
+        self.process_worker.finished.connect(lambda: self.refresh_button.setEnabled(True))
+        self.process_worker.start()
     
-    def populate_process_list(self, processes):
-        self.process_list.clear()
+    def on_processes_received(self, processes):
+        self.all_processes = processes
+        self.lc_commands = [p.command.lower() for p in processes]
         
-        for proc in processes:
-            cpu_bar = "█" * int(proc['cpu'] / 10) if proc['cpu'] > 0 else ""
-            mem_bar = "█" * int(proc['mem'] / 10) if proc['mem'] > 0 else ""
-            
-            item_text = f"PID: {proc['pid']:<8} CPU: {proc['cpu']:<5.1f}% {cpu_bar:<10} MEM: {proc['mem']:<5.1f}% {mem_bar:<10} USER: {proc['user']:<10} CMD: {proc['command'][:50]}"
-            
-            list_item = QListWidgetItem(item_text)
-            list_item.setData(Qt.UserRole, proc)
-            list_item.setFont(QFont('Courier', 9))
-            
-            if proc['cpu'] > 50:
-                list_item.setBackground(Qt.red)
-            elif proc['cpu'] > 20:
-                list_item.setBackground(Qt.yellow)
+        self.populate_process_list(processes)
+        self.filter_processes()
+        
+        self.process_count_label.setText(f"Processes: {len(processes)}")
+    
+    def on_processes_error(self, error):
+        error_msg = f"Failed to get processes: {error}"
+        QMessageBox.warning(self, "Error", error_msg)
+    
+    def populate_process_list(self, processes):
+        # Rebuild with signals blocked and repaints off, so the list lays out
+        # and paints once at the end rather than reacting to every row
+        process_list = self.process_list
+        process_list.setUpdatesEnabled(False)
+        was_blocked = process_list.blockSignals(True)
+        try:
+            process_list.clear()
+            self.process_items = []
             
-            self.process_list.addItem(list_item)
+            for proc in processes:
+                item_text = _PROC_FMT % (proc.pid, proc.cpu, _usage_bar(proc.cpu), proc.mem,
+                                         _usage_bar(proc.mem), proc.user, proc.command[:50])
+                
+                list_item = QListWidgetItem(item_text)
+                list_item.setData(Qt.UserRole, proc)
+                
+                if proc.cpu > 50:
+                    list_item.setBackground(self.high_cpu_brush)
+                elif proc.cpu > 20:
+                    list_item.setBackground(self.mid_cpu_brush)
+                
+                process_list.addItem(list_item)
+                self.process_items.append(list_item)
+        finally:
+            # Never leave the list frozen, even if a row fails to build
+            process_list.blockSignals(was_blocked)
+            process_list.setUpdatesEnabled(True)
+        # The clear above dropped the selection without telling anyone
+        self.on_selection_changed()
+    
+    def apply_filter_now(self):
+        self.filter_timer.stop()
+        self.filter_processes()
     
     def filter_processes(self):
+        # Hide non-matching rows instead of rebuilding the list for each filter
         filter_text = self.filter_input.text().lower()
-        if not hasattr(self, 'all_processes'):
-            return
-        
-        if not filter_text:
-            filtered_processes = self.all_processes
-        else:
-            filtered_processes = [p for p in self.all_processes if filter_text in p['command'].lower()]
-        
-        self.populate_process_list(filtered_processes)
+        self.process_list.setUpdatesEnabled(False)
+        try:
+            for item, lc_command in zip(self.process_items, self.lc_commands):
+                hidden = filter_text not in lc_command
+                # Each setHidden relayouts the view, so only touch rows that change
+                if item.isHidden() != hidden:
+                    item.setHidden(hidden)
+        finally:
+            self.process_list.setUpdatesEnabled(True)
     
     def on_selection_changed(self):
         selected_items = self.process_list.selectedItems()
@@ -671,8 +503,8 @@ class ProcessExplorer(QWidget):
             return
         
         process_data = selected_items[0].data(Qt.UserRole)
-        pid = process_data['pid']
-        command = process_data['command']
+        pid = process_data.pid
+        command = process_data.command
         
         reply = QMessageBox.question(
             self, 
@@ -702,9 +534,11 @@ class ProcessExplorer(QWidget):
             return
         
         process_data = selected_items[0].data(Qt.UserRole)
-        command_name = process_data['command'].split()[0]
+        command_name = process_data.command.split()[0]
         
-        matching_processes = [p for p in self.all_processes if command_name in p['command']]
+        # Only numeric pids go into the kill command line
+        matching_processes = [p for p in self.all_processes
+                              if command_name in p.command and p.pid.isdigit()]
         
         reply = QMessageBox.question(
             self,
@@ -714,30 +548,186 @@ class ProcessExplorer(QWidget):
             QMessageBox.No
         )
         
-        if reply == QMessageBox.Yes:
-            killed_count = 0
-            for proc in matching_processes:
-                try:
-                    stdout, stderr, return_code = self.ssh_client.execute_command(f'kill {proc["pid"]}')
-                    if return_code == 0:
-                        killed_count += 1
-                except:
-                    pass
+        if reply == QMessageBox.Yes and matching_processes:
+            # kill takes any number of pids, so one command covers them all
+            pids = ' '.join(p.pid for p in matching_processes)
+            try:
+                stdout, stderr, return_code = self.ssh_client.execute_command(f'kill {pids}')
+                
+                if return_code != 0:
+                    # kill reports each pid it couldn't signal on its own line
+                    failed_count = len(stderr.splitlines())
+                    error_msg = f"Failed to kill {failed_count} of {len(matching_processes)} processes:\n{stderr}"
+                    QMessageBox.warning(self, "Kill Failed", error_msg)
+                    
+            except Exception as e:
+                error_msg = f"Error killing processes: {str(e)}"
+                QMessageBox.warning(self, "Error", error_msg)
             
             self.refresh_processes()
     
     def disconnect(self):
-        self.parent().parent().parent().disconnect_tab(self)
+        self.disconnect_requested.emit()
+
+
+
 
+class ListDirWorker(QThread):
+    """QThread for streaming a directory listing in background"""
+    
+    # Signals for communicating with main thread
+    entries_received = pyqtSignal(list)  # Chunk of directory entries
+    listing_done = pyqtSignal(int)       # Total entry count
+    error_occurred = pyqtSignal(str)     # Error messages
+    
+    CHUNK_SIZE = 256
+    
+    def __init__(self, ssh_client, path, force=False):
+        super().__init__()
+        self.ssh_client = ssh_client
+        self.path = path
+        self.force = force
+        self.running = False
+    
+    def run(self):
+        self.running = True
+        count = 0
+        chunk = []
+        entries = None
+        try:
+            entries = self.ssh_client.iter_directory(self.path, self.force)
+            for entry in entries:
+                if not self.running:
+                    return
+                chunk.append(entry)
+                if len(chunk) >= self.CHUNK_SIZE:
+                    self.entries_received.emit(chunk)
+                    count += len(chunk)
+                    chunk = []
+            
+            if chunk:
+                self.entries_received.emit(chunk)
+                count += len(chunk)
+            self.listing_done.emit(count)
+            
+        except Exception as e:
+            if self.running:
+                self.error_occurred.emit(str(e))
+        finally:
+            # Finish the generator here so the SFTP lock is released now
+            if entries is not None:
+                entries.close()
+    
+    def stop(self):
+        """Stop the thread gracefully"""
+        self.running = False
 
 
+class ChangeDirWorker(QThread):
+    """QThread for checking and entering a directory without blocking the UI"""
+    
+    # Signals for communicating with main thread
+    changed = pyqtSignal(str)  # New current path
+    failed = pyqtSignal(str)   # Error message
+    
+    def __init__(self, ssh_client, path):
+        super().__init__()
+        self.ssh_client = ssh_client
+        self.path = path
+    
+    def run(self):
+        try:
+            self.changed.emit(self.ssh_client.change_directory(self.path))
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class DirListModel(QAbstractListModel):
+    """Directory entries for DirectoryExplorer, formatted only as rows are drawn"""
+    
+    def __init__(self, parent_icon, type_icons, parent=None):
+        super().__init__(parent)
+        self.parent_icon = parent_icon
+        self.type_icons = type_icons
+        # One [sort_key, type, name, size, text] list per row. The sort key is
+        # a rank digit (parent, directories, files) plus the lowercased name;
+        # text is filled in the first time the row is displayed.
+        self.rows = []
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        row = self.rows[index.row()]
+        if role == Qt.DisplayRole:
+            if row[4] is None:
+                row[4] = f"{row[2]} ({format_file_size(row[3])})"
+            return row[4]
+        if role == Qt.DecorationRole:
+            if row[0] == '0':
+                return self.parent_icon
+            return self.type_icons.get(row[1], self.type_icons['file'])
+        if role == Qt.UserRole:
+            return (row[1], row[2])
+        return None
+    
+    def clear(self):
+        self.beginResetModel()
+        self.rows = []
+        self.endResetModel()
+    
+    def add_parent_entry(self):
+        self.add_rows([['0', 'directory', '..', None, ".. (Parent Directory)"]])
+    
+    def add_entries(self, entries):
+        """Append a chunk of entries from the listing worker"""
+        rows = []
+        for item in entries:
+            name = item['name']
+            if item['type'] == 'directory':
+                rows.append(['1' + name.lower(), 'directory', name, None, name])
+            else:
+                rows.append(['2' + name.lower(), item['type'], name, item['size'], None])
+        self.add_rows(rows)
+    
+    def add_rows(self, rows):
+        if not rows:
+            return
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self.rows.extend(rows)
+        self.endInsertRows()
+    
+    def sort_entries(self):
+        """Order rows parent entry first, then directories, then files"""
+        # A reset rather than a layout change: nothing can be selected yet
+        # while a listing streams in, so there are no indexes to carry over
+        self.beginResetModel()
+        self.rows.sort(key=itemgetter(0))
+        self.endResetModel()
+
 
 class DirectoryExplorer(QWidget):
     """Main directory exploration interface"""
     
+    disconnect_requested = pyqtSignal()
+    
     def __init__(self, ssh_client):
         super().__init__()
         self.ssh_client = ssh_client
+        self.list_worker = None
+        # Stopped listing workers still winding down, kept alive until they finish
+        self.stopped_workers = []
+        self.cd_worker = None
+        
+        # Refresh requests arriving in a burst (repeated clicks on Refresh,
+        # navigation landing) are folded into one listing
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(30)
+        self.refresh_timer.timeout.connect(self.run_scheduled_refresh)
+        self.refresh_forced = False
+        
         self.init_ui()
         self.go_home()
     
@@ -765,7 +755,8 @@ class DirectoryExplorer(QWidget):
         self.back_button = QPushButton("← Back")
         self.back_button.clicked.connect(self.go_back)
         self.refresh_button = QPushButton("🔄 Refresh")
-        self.refresh_button.clicked.connect(self.refresh_directory)
+        # An explicit refresh always goes back to the server
+        self.refresh_button.clicked.connect(lambda: self.schedule_refresh(force=True))
         self.home_button = QPushButton("🏠 Home")
         self.home_button.clicked.connect(self.go_home)
         self.root_button = QPushButton("/ Root")
@@ -784,8 +775,29 @@ class DirectoryExplorer(QWidget):
         splitter = QSplitter(Qt.Horizontal)
         
         # Directory listing
-        self.dir_list = QListWidget()
-        self.dir_list.itemDoubleClicked.connect(self.item_double_clicked)
+        # Entry icons, built once and shared by every list item
+        style = self.style()
+        self.parent_icon = style.standardIcon(QStyle.SP_FileDialogToParent)
+        self.type_icons = {
+            'directory': style.standardIcon(QStyle.SP_DirIcon),
+            'link': style.standardIcon(QStyle.SP_FileLinkIcon),
+            'executable': style.standardIcon(QStyle.SP_CommandLink),
+            'file': style.standardIcon(QStyle.SP_FileIcon),
+        }
+        
+        self.dir_model = DirListModel(self.parent_icon, self.type_icons, self)
+        self.dir_list = QListView()
+        self.dir_list.setModel(self.dir_model)
+        self.dir_list.setUniformItemSizes(True)  # Every row is one line of text
+        # Size icons to the text line, so the one row height uniform sizing
+        # measures is just the font height, whatever size the style's icons are
+        line_height = QFontMetrics(self.dir_list.font()).height()
+        self.dir_list.setIconSize(QSize(line_height, line_height))
+        # Lay rows out 100 at a time from the event loop, so the first screen
+        # of a big directory paints before the rest has been positioned
+        self.dir_list.setLayoutMode(QListView.Batched)
+        self.dir_list.setBatchSize(100)
+        self.dir_list.doubleClicked.connect(self.item_double_clicked)
         splitter.addWidget(self.dir_list)
         
         # Manual path input
@@ -806,102 +818,110 @@ class DirectoryExplorer(QWidget):
         main_layout.addLayout(input_layout, stretch=1)
         
         self.setLayout(main_layout)
-        
-        # Log initial connection
-        conn_info = self.ssh_client.connection_info
-        connection_text = f'{conn_info["username"]}@{conn_info["hostname"]}:{conn_info["port"]}'
     
-    def log_activity(self, message):
-        """Log activity to the output area"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.output_text.append(f"[{timestamp}] {message}")
+    def refresh_directory(self, force=False):
+        """Refresh the directory listing; force skips the listing cache"""
+        self.stop_listing()
         
-        # Auto-scroll to bottom
-        scrollbar = self.output_text.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+        self.dir_model.clear()
+        current_path = self.ssh_client.get_current_path()
+        
+        # Update path label
+        self.path_label.setText(f"Current Path: {current_path}")
+        
+        # Add parent directory if not at root
+        if current_path != '/':
+            self.dir_model.add_parent_entry()
+        
+        # Stream the listing in from a worker; entries are inserted in chunks
+        # with repaints held off until the whole listing is in and sorted
+        self.dir_list.setUpdatesEnabled(False)
+        self.list_worker = ListDirWorker(self.ssh_client, current_path, force)
+        self.list_worker.entries_received.connect(self.on_entries_received)
+        self.list_worker.listing_done.connect(self.on_listing_done)
+        self.list_worker.error_occurred.connect(self.on_listing_error)
+        self.list_worker.start()
     
-    def refresh_directory(self):
-        """Refresh the directory listing"""
-        try:
-            self.dir_list.clear()
-            current_path = self.ssh_client.get_current_path()
-            
-            # Update path label
-            self.path_label.setText(f"Current Path: {current_path}")
-            
-            # Get directory listing
-            items = self.ssh_client.list_directory()
-            
-            # Add parent directory if not at root
-            if current_path != '/':
-                parent_item = QListWidgetItem("📁 .. (Parent Directory)")
-                parent_item.setData(Qt.UserRole, ('directory', '..'))
-                self.dir_list.addItem(parent_item)
-            
-            # Sort items: directories first, then files
-            directories = [item for item in items if item['type'] == 'directory']
-            files = [item for item in items if item['type'] != 'directory']
-            
-            # Add directories
-            for item in sorted(directories, key=lambda x: x['name'].lower()):
-                list_item = QListWidgetItem(f"📁 {item['name']}")
-                list_item.setData(Qt.UserRole, ('directory', item['name']))
-                self.dir_list.addItem(list_item)
-            
-            # Add files
-            for item in sorted(files, key=lambda x: x['name'].lower()):
-                if item['type'] == 'link':
-                    icon = "🔗"
-                elif item['type'] == 'executable':
-                    icon = "⚙️"
-                else:
-                    icon = "📄"
-                
-                # Format size
-                size_str = self.format_file_size(item['size'])
-                item_text = f"{icon} {item['name']} ({size_str})"
-                
-                list_item = QListWidgetItem(item_text)
-                list_item.setData(Qt.UserRole, (item['type'], item['name']))
-                self.dir_list.addItem(list_item)
-            
-        except Exception as e:
-            error_msg = f"Failed to list directory: {str(e)}"
-            QMessageBox.warning(self, "Error", error_msg)
+    def schedule_refresh(self, force=False):
+        """Refresh shortly, once for any number of requests in the meantime"""
+        self.refresh_forced = self.refresh_forced or force
+        self.refresh_timer.start()
     
-    def format_file_size(self, size_str):
-        """Format file size in human readable format"""
-        try:
-            size_bytes = int(size_str)
-            if size_bytes == 0:
-                return "0B"
-            
-            size_names = ["B", "KB", "MB", "GB"]
-            i = 0
-            while size_bytes >= 1024 and i < len(size_names) - 1:
-                size_bytes /= 1024.0
-                i += 1
-            
-            return f"{size_bytes:.1f}{size_names[i]}"
-        except ValueError:
-            return size_str
+    def run_scheduled_refresh(self):
+        # A cd in flight is using the SFTP session and moving the path; try
+        # again shortly, once it has finished
+        if self.cd_worker and self.cd_worker.isRunning():
+            self.refresh_timer.start()
+            return
+        force = self.refresh_forced
+        self.refresh_forced = False
+        self.refresh_directory(force)
+    
+    def stop_listing(self):
+        """Stop any listing still in flight, so it can't race a new one"""
+        worker = self.list_worker
+        if worker:
+            # The worker may be stuck in a slow SFTP read or listing command, so
+            # don't wait on it here; it stops at its next entry, or when the
+            # call returns, and is dropped once it has finished
+            worker.stop()
+            worker.entries_received.disconnect()
+            worker.listing_done.disconnect()
+            worker.error_occurred.disconnect()
+            self.stopped_workers.append(worker)
+            worker.finished.connect(lambda: self.forget_worker(worker))
+            if worker.isFinished():
+                self.forget_worker(worker)
+            self.list_worker = None
+            self.dir_list.setUpdatesEnabled(True)
+    
+    def forget_worker(self, worker):
+        if worker in self.stopped_workers:
+            self.stopped_workers.remove(worker)
+    
+    def on_entries_received(self, entries):
+        # Signals already queued by a stopped worker can still arrive
+        if self.sender() is self.list_worker:
+            self.dir_model.add_entries(entries)
+    
+    def on_listing_done(self, count):
+        if self.sender() is not self.list_worker:
+            return
+        self.dir_model.sort_entries()
+        self.dir_list.setUpdatesEnabled(True)
+    
+    def on_listing_error(self, error):
+        if self.sender() is not self.list_worker:
+            return
+        self.dir_list.setUpdatesEnabled(True)
+        error_msg = f"Failed to list directory: {error}"
+        QMessageBox.warning(self, "Error", error_msg)
     
-    def item_double_clicked(self, item):
+    def item_double_clicked(self, index):
         """Handle double-click on directory items"""
-        item_type, name = item.data(Qt.UserRole)
+        item_type, name = index.data(Qt.UserRole)
         
         if item_type == 'directory':
             self.navigate_to_directory(name)
     
+    def start_change_directory(self, path, on_failed, on_changed=None):
+        """Change directory on a worker, then list the new directory"""
+        # One change at a time; clicks while it's in flight are dropped
+        if self.cd_worker and self.cd_worker.isRunning():
+            return
+        
+        self.stop_listing()
+        self.cd_worker = ChangeDirWorker(self.ssh_client, path)
+        self.cd_worker.changed.connect(lambda _: self.schedule_refresh())
+        if on_changed:
+            self.cd_worker.changed.connect(on_changed)
+        self.cd_worker.failed.connect(on_failed)
+        self.cd_worker.start()
+    
     def navigate_to_directory(self, dir_name):
         """Navigate to a directory"""
-        try:
-            new_path = self.ssh_client.change_directory(dir_name)
-            self.refresh_directory()
-            
-        except Exception as e:
-            error_msg = f"Cannot access directory '{dir_name}': {str(e)}"
-            QMessageBox.warning(self, "Navigation Error", error_msg)
+        self.start_change_directory(dir_name, lambda error: QMessageBox.warning(
+            self, "Navigation Error", f"Cannot access directory '{dir_name}': {error}"))
     
     def go_back(self):
         """Go to parent directory"""
@@ -911,21 +931,13 @@ class DirectoryExplorer(QWidget):
     
     def go_home(self):
         """Go to user home directory"""
-        try:
-            home_path = self.ssh_client.get_home_directory()
-            self.ssh_client.change_directory(home_path)
-            self.refresh_directory()
-        except Exception as e:
-            self.refresh_directory()
+        # change_directory expands ~ from the home directory cached at connect
+        self.start_change_directory('~', lambda error: self.schedule_refresh())
     
     def go_root(self):
         """Go to root directory"""
-        try:
-            self.ssh_client.change_directory('/')
-            self.refresh_directory()
-        except Exception as e:
-            error_msg = f"Cannot access root directory: {str(e)}"
-            QMessageBox.warning(self, "Navigation Error", error_msg)
+        self.start_change_directory('/', lambda error: QMessageBox.warning(
+            self, "Navigation Error", f"Cannot access root directory: {error}"))
     
     def navigate_to_path(self):
         """Navigate to manually entered path"""
@@ -933,28 +945,56 @@ class DirectoryExplorer(QWidget):
         if not path:
             return
         
-        try:
-            new_path = self.ssh_client.change_directory(path)
-            self.path_input.clear()
-            self.refresh_directory()
-        except Exception as e:
-            error_msg = f"Cannot access path '{path}': {str(e)}"
-            QMessageBox.warning(self, "Path Error", error_msg)
+        self.start_change_directory(
+            path,
+            lambda error: QMessageBox.warning(
+                self, "Path Error", f"Cannot access path '{path}': {error}"),
+            lambda _: self.path_input.clear())
 
     def disconnect(self):
-        """Signal parent to disconnect this tab"""
-        # This will be handled by the parent MainWindow
-        self.parent().parent().parent().disconnect_tab(self)
+        """Ask for this tab to be disconnected and closed"""
+        self.disconnect_requested.emit()
 
 
 
 
+class CommandWorker(QThread):
+    """QThread for running a typed command without blocking the UI"""
+    
+    # Signals for communicating with main thread
+    error_occurred = pyqtSignal(str)  # Error messages
+    
+    def __init__(self, ssh_client, command):
+        super().__init__()
+        self.ssh_client = ssh_client
+        self.command = command
+    
+    def run(self):
+        try:
+            # The output lands in the client's history, which the widget shows
+            self.ssh_client.execute_user_command(self.command)
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+
+
 class CommandLineWidget(QWidget):
+    # Every command typed, one per line, shared by all command lines
+    HISTORY_PATH = os.path.join(SSHClient.DATA_DIR, "command_history.txt")
+    
     def __init__(self, ssh_client):
         super().__init__()
         self.ssh_client = ssh_client
-        self.command_history = []
+        # Commands typed here, for Up/Down recall; the oldest drop off
+        self.command_history = collections.deque(maxlen=1000)
         self.history_index = -1
+        self.history_loaded = False  # Saved history is read on first recall
+        self.command_worker = None
+        self.shown_entry = None  # Newest history entry on screen
+        self.shown_path = None   # Directory in the prompt label
+        
+        # Fixed for the life of the connection, so the prompt prefix is built once
+        conn_info = self.ssh_client.connection_info
+        self.user_host = f"{conn_info['username']}@{conn_info['hostname']}"
         self.init_ui()
 
         self.timer = QTimer()
@@ -966,22 +1006,24 @@ class CommandLineWidget(QWidget):
     def init_ui(self):
         layout = QVBoxLayout()
         
-        self.output_text = QTextEdit()
+        # Plain text with a block limit: appends skip rich-text parsing and the
+        # oldest lines are dropped automatically
+        self.output_text = QPlainTextEdit()
         self.output_text.setReadOnly(True)
-        self.output_text.setFont(QFont('Courier', 10))
+        self.output_text.setMaximumBlockCount(500)
+        self.output_text.setUndoRedoEnabled(False)
+        self.output_text.setFont(_get_mono_font())
         self.output_text.setStyleSheet("background-color: #1e1e1e; color: #ffffff;")
         layout.addWidget(self.output_text)
         
         input_layout = QHBoxLayout()
         
-        conn_info = self.ssh_client.connection_info
-        prompt_text = f"{conn_info['username']}@{conn_info['hostname']}:$ "
-        self.prompt_label = QLabel(prompt_text)
-        self.prompt_label.setFont(QFont('Courier', 10))
+        self.prompt_label = QLabel(f"{self.user_host}:$ ")
+        self.prompt_label.setFont(_get_mono_font())
         self.prompt_label.setStyleSheet("color: #00ff00; background-color: #1e1e1e; padding: 5px;")
         
         self.command_input = QLineEdit()
-        self.command_input.setFont(QFont('Courier', 10))
+        self.command_input.setFont(_get_mono_font())
         self.command_input.setStyleSheet("background-color: #1e1e1e; color: #ffffff; border: 1px solid #444; padding: 5px;")
         self.command_input.returnPressed.connect(self.execute_command)
         
@@ -1003,7 +1045,32 @@ class CommandLineWidget(QWidget):
                 return True
         return super().eventFilter(obj, event)
     
+    def load_command_history(self):
+        """Replace the recall history with the tail of the saved one"""
+        self.history_loaded = True
+        try:
+            with open(self.HISTORY_PATH, 'r', encoding='utf-8', errors='replace') as f:
+                # Streams the file, holding only the newest maxlen lines.
+                # Commands from this session were saved too, so they're included.
+                self.command_history = collections.deque(
+                    (line.rstrip('\n') for line in f), maxlen=self.command_history.maxlen)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Failed to load command history: {e}")
+        self.history_index = len(self.command_history)
+    
+    def save_command(self, command):
+        """Append a command to the saved history"""
+        try:
+            with open(self.HISTORY_PATH, 'a', encoding='utf-8') as f:
+                f.write(command + '\n')
+        except Exception as e:
+            print(f"Failed to save command history: {e}")
+    
     def navigate_history(self, direction):
+        if not self.history_loaded:
+            self.load_command_history()
         if not self.command_history:
             return
         
@@ -1024,32 +1091,72 @@ class CommandLineWidget(QWidget):
         
         self.command_history.append(command)
         self.history_index = len(self.command_history)
+        self.save_command(command)
         
-        conn_info = self.ssh_client.connection_info
-        current_path = self.ssh_client.get_current_path()
-        prompt = f"{conn_info['username']}@{conn_info['hostname']}:{current_path}$ {command}"
+        prompt = f"{self.user_host}:{self.ssh_client.get_current_path()}$ {command}"
         
-        self.output_text.append(prompt)
         self.command_input.clear()
         
-        try:
-            self.ssh_client.execute_user_command(command)
-            self.update_display()
-        except Exception as e:
-            self.output_text.append(f"Error: {str(e)}")
+        # Run it on a worker; input is held off until it finishes, so commands
+        # run in the order they were typed. A successful command is shown by
+        # the history rebuild, so only a failure writes here directly.
+        self.command_input.setEnabled(False)
+        self.command_worker = CommandWorker(self.ssh_client, command)
+        self.command_worker.error_occurred.connect(
+            lambda error: self.output_text.appendPlainText(f"{prompt}\nError: {error}"))
+        self.command_worker.finished.connect(self.on_command_finished)
+        self.command_worker.start()
+    
+    def on_command_finished(self):
+        self.command_input.setEnabled(True)
+        self.command_input.setFocus()
+        self.update_display()
     
     def update_display(self):
-        history = self.ssh_client.get_user_command_history()
-        
-        self.output_text.clear()
+        # Nothing to redraw while this tab is hidden; showEvent catches up
+        if not self.isVisible():
+            return
         
-        for entry in history:
-            self.output_text.append(entry)
+        # Only rebuild the text when a command has been added since last time.
+        # Command workers append to history, so work from a snapshot of it.
+        history = list(self.ssh_client.get_user_command_history())
+        last_entry = history[-1] if history else None
+        if last_entry is not self.shown_entry:
+            self.shown_entry = last_entry
+            # The view only keeps its last maximumBlockCount lines, so collect
+            # entries from the newest back until there are enough of them
+            max_lines = self.output_text.maximumBlockCount()
+            parts = []
+            line_count = 0
+            for entry in reversed(history):
+                if entry.output:
+                    parts.append(entry.output)
+                    line_count += entry.output.count('\n') + 1
+                parts.append(entry.command)
+                line_count += 1
+                if line_count >= max_lines:
+                    break
+            parts.reverse()
+            
+            # Follow new output only if the view was already at the bottom, so
+            # a rebuild doesn't yank away someone reading further up
+            scrollbar = self.output_text.verticalScrollBar()
+            scroll_value = scrollbar.value()
+            was_at_bottom = scroll_value >= scrollbar.maximum() - 4
+            self.output_text.setPlainText('\n'.join(parts))
+            if was_at_bottom:
+                self.output_text.moveCursor(QTextCursor.End)
+            else:
+                scrollbar.setValue(scroll_value)
         
-        conn_info = self.ssh_client.connection_info
         current_path = self.ssh_client.get_current_path()
-        prompt_text = f"{conn_info['username']}@{conn_info['hostname']}:{current_path}$ "
-        self.prompt_label.setText(prompt_text)
+        if current_path != self.shown_path:
+            self.shown_path = current_path
+            self.prompt_label.setText(f"{self.user_host}:{current_path}$ ")
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_display()
 
 
 
@@ -1077,11 +1184,30 @@ class MainWindow(QMainWindow):
 
         self.setCentralWidget(self.tabs)
 
-        # Keep track of SSH clients for cleanup
-        self.ssh_clients = {}
+        # Each SSHWidget tab holds its own ssh_client, so closing a tab never
+        # has to re-index a separate table of clients
+        QApplication.instance().aboutToQuit.connect(self.disconnect_all)
+
+        # Workers still connecting saved clients, kept alive until they finish
+        self.connect_workers = []
 
         self.add_plus_tab()
 
+    def open_saved_clients(self):
+        """Reconnect saved clients in the background, all at once"""
+        for conn_info in SSHClient.get_saved_clients():
+            worker = SSHConnectWorker(
+                conn_info["hostname"],
+                conn_info["username"],
+                conn_info.get("password", None),
+                conn_info["port"],
+            )
+            worker.connected.connect(self.add_ssh_tab)
+            worker.failed.connect(lambda title, message: print(f"{title}: {message}"))
+            worker.finished.connect(lambda w=worker: self.connect_workers.remove(w))
+            self.connect_workers.append(worker)
+            worker.start()
+
     def add_plus_tab(self):
         """Add the '+' tab for new connections"""
         login_widget = SSHLoginWidget()
@@ -1100,52 +1226,57 @@ class MainWindow(QMainWindow):
         # Remove close button from '+' tab
         self.tabs.tabBar().setTabButton(tab_index, QTabBar.RightSide, None)
 
-    def create_ssh_widget(self, ssh_client):
-        """Handle successful SSH connection"""
-        current_index = self.tabs.currentIndex()
-        directory_explorer = SSHWidget(ssh_client)
+    def add_ssh_tab(self, ssh_client):
+        """Add a tab for a connected client just before the '+' tab"""
+        # Connections finish in the background, so the user may be on any tab
+        # by now; look the '+' tab up rather than assuming it's current
+        plus_index = self.tabs.count()
+        for i in range(self.tabs.count()):
+            if self.tabs.tabText(i) == '+':
+                plus_index = i
+                break
+        ssh_widget = SSHWidget(ssh_client)
+        ssh_widget.disconnect_requested.connect(self.disconnect_tab)
         
         conn_info = ssh_client.connection_info
         tab_title = f"{conn_info['username']}@{conn_info['hostname']}"
         
-        self.tabs.removeTab(current_index)
-        new_index = self.tabs.insertTab(current_index, directory_explorer, tab_title)
+        return self.tabs.insertTab(plus_index, ssh_widget, tab_title)
+
+    def create_ssh_widget(self, ssh_client):
+        """Handle successful SSH connection"""
+        new_index = self.add_ssh_tab(ssh_client)
         self.tabs.setCurrentIndex(new_index)
         
-        self.ssh_clients[new_index] = ssh_client
+        # Swap in a fresh login form for the one that was just used
         self.add_plus_tab()
 
-    def disconnect_tab(self, directory_explorer):
-        """Handle disconnect request from DirectoryExplorer"""
-        # Find the tab containing this directory explorer
-        for i in range(self.tabs.count()):
-            if self.tabs.widget(i) == directory_explorer:
-                self.close_tab(i)
-                break
+    def disconnect_tab(self, ssh_widget):
+        """Handle disconnect request from an SSHWidget"""
+        index = self.tabs.indexOf(ssh_widget)
+        if index >= 0:
+            self.close_tab(index)
 
     def close_tab(self, index):
         """Close a tab and clean up resources"""
         if self.tabs.tabText(index) != '+':
             # Clean up SSH client if it exists
-            if index in self.ssh_clients:
-                ssh_client = self.ssh_clients[index]
-                ssh_client.disconnect()
-                del self.ssh_clients[index]
-            
-            # Update indices in ssh_clients dict
-            updated_clients = {}
-            for idx, client in self.ssh_clients.items():
-                if idx > index:
-                    updated_clients[idx - 1] = client
-                elif idx < index:
-                    updated_clients[idx] = client
-            self.ssh_clients = updated_clients
+            widget = self.tabs.widget(index)
+            if isinstance(widget, SSHWidget):
+                widget.ssh_client.disconnect()
             self.tabs.removeTab(index)
 
+    def disconnect_all(self):
+        """Close every SSH connection; safe to call more than once"""
+        for i in range(self.tabs.count()):
+            widget = self.tabs.widget(i)
+            if isinstance(widget, SSHWidget):
+                widget.ssh_client.disconnect()
+        SSHClient.close_pool()
+
     def closeEvent(self, event):
         """Clean up all SSH connections when closing the application"""
-        for ssh_client in self.ssh_clients.values():
-            ssh_client.disconnect()
+        self.disconnect_all()
         event.accept()
 
 
@@ -1153,12 +1284,8 @@ def main():
     app = QApplication(sys.argv)
     
     main_window = MainWindow()
-
-    for conn_info in SSHClient.get_saved_clients():
-        sshclient = SSHClient.start_saved_client(conn_info)
-        main_window.create_ssh_widget(sshclient)
-
     main_window.show()
+    main_window.open_saved_clients()
     
     sys.exit(app.exec_())
 